@@ -1,6 +1,11 @@
 """OpenMark Flask Application Factory."""
 
+import atexit
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_swagger_ui import get_swaggerui_blueprint
 
@@ -8,11 +13,36 @@ from app.config import Config
 from app.plugins import PluginManager
 from app.jwt_handler import init_jwt_handler
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Swagger UI configuration
 SWAGGER_URL = '/api/docs'
 API_URL = '/static/swagger.json'
 
 
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider parsing request bodies with orjson.
+    
+    Responses keep Flask's encoder (API routes already serialize with orjson
+    through json_response), so only decoding is overridden.
+    """
+    
+    def loads(self, s, **kwargs):
+        """Deserialize JSON data with orjson.
+        
+        Args:
+            s: JSON text or bytes
+            
+        Returns:
+            Decoded Python object
+        """
+        return orjson.loads(s)
+
+
 def create_app(config_path: str = 'config.json') -> Flask:
     """Create and configure the Flask application.
     
@@ -31,6 +61,24 @@ def create_app(config_path: str = 'config.json') -> Flask:
     app.config['SECRET_KEY'] = config.server.get('secret_key', 'dev-secret-key')
     app.config['CONFIG'] = config
     
+    # Resolve the cache directory once: request handlers only join file names
+    cache_dir_config = config.cache.get('directory', './cache')
+    app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    if os.path.isabs(cache_dir_config):
+        cache_dir = cache_dir_config
+    else:
+        cache_dir = os.path.normpath(os.path.join(app_root, cache_dir_config))
+    os.makedirs(cache_dir, exist_ok=True)
+    app.config['CACHE_DIR'] = cache_dir
+    
+    # Let a front server supporting X-Sendfile (e.g. Apache mod_xsendfile) send cached
+    # PDFs itself, with sendfile(2), instead of streaming them through Python
+    app.config['USE_X_SENDFILE'] = config.server.get('use_x_sendfile', False)
+    
+    # Parse JSON request bodies (e.g. saveAnnotations payloads) with orjson
+    if ORJSON_AVAILABLE:
+        app.json = ORJSONProvider(app)
+    
     # Initialize JWT handler for Document Access Tokens
     jwt_handler = init_jwt_handler(app.config['SECRET_KEY'])
     app.config['JWT_HANDLER'] = jwt_handler
@@ -51,6 +99,16 @@ def create_app(config_path: str = 'config.json') -> Flask:
     plugin_manager = PluginManager(config)
     app.config['PLUGIN_MANAGER'] = plugin_manager
     
+    # Shared pool for the background document downloads into the cache.
+    # Downloads are I/O-bound, so the default runs several per CPU.
+    cache_pool = ThreadPoolExecutor(
+        max_workers=config.cache.get('download_workers', min(32, (os.cpu_count() or 4) * 4)),
+        thread_name_prefix='openmark-cache'
+    )
+    app.extensions['cache_pool'] = cache_pool
+    # Drop queued downloads at exit instead of draining them
+    atexit.register(cache_pool.shutdown, wait=False, cancel_futures=True)
+    
     # Register Swagger UI blueprint
     swaggerui_blueprint = get_swaggerui_blueprint(
         SWAGGER_URL,
@@ -71,7 +129,6 @@ def create_app(config_path: str = 'config.json') -> Flask:
     app.register_blueprint(views_bp)
     
     # Initialize cache cleaner (only in non-reloader process)
-    import os
     if os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not app.debug:
         from app.cache_cleaner import init_cache_cleaner
         init_cache_cleaner(app)
@@ -29,13 +29,16 @@ class CacheCleaner:
                     cls._instance._initialized = False
         return cls._instance
     
-    def __init__(self, cache_dir: str, duration_seconds: int, temp_documents: dict):
+    def __init__(self, cache_dir: str, duration_seconds: int, temp_documents: dict,
+                 download_status: Optional[dict] = None):
         """Initialize the cache cleaner.
         
         Args:
             cache_dir: Absolute path to the cache directory
             duration_seconds: Cache duration in seconds
             temp_documents: Reference to the temp_documents dict from api.py
+            download_status: Reference to the download_status dict from api.py,
+                pruned along with temp_documents (optional)
         """
         if self._initialized:
             return
@@ -43,6 +46,7 @@ class CacheCleaner:
         self.cache_dir = cache_dir
         self.duration_seconds = duration_seconds
         self.temp_documents = temp_documents
+        self.download_status = download_status if download_status is not None else {}
         self._stop_event = threading.Event()
         self._thread: Optional[threading.Thread] = None
         self._initialized = True
@@ -86,53 +90,65 @@ class CacheCleaner:
         if not os.path.exists(self.cache_dir):
             return
         
-        now = datetime.utcnow()
+        now_ts = time.time()
         expired_count = 0
         cleaned_count = 0
         
-        # Get list of expired temp_documents
+        # Get list of expired temp_documents. Entries carry their expiry as an
+        # epoch timestamp, so no date string is parsed here.
         expired_docs = []
         for temp_doc_id, doc_info in list(self.temp_documents.items()):
             try:
-                expires_at = datetime.fromisoformat(doc_info['expires_at'].rstrip('Z'))
-                if now > expires_at:
+                if now_ts > doc_info['expires_ts']:
                     expired_docs.append(temp_doc_id)
-            except (KeyError, ValueError) as e:
+            except (KeyError, TypeError) as e:
                 logger.warning(f"Invalid doc_info for {temp_doc_id}: {e}")
                 expired_docs.append(temp_doc_id)
         
         # Remove expired entries from temp_documents and delete cache files
+        temp_documents_pop = self.temp_documents.pop
+        download_status_pop = self.download_status.pop
         for temp_doc_id in expired_docs:
-            # Remove from temp_documents
-            if temp_doc_id in self.temp_documents:
-                del self.temp_documents[temp_doc_id]
+            if temp_documents_pop(temp_doc_id, None) is not None:
                 expired_count += 1
+            download_status_pop(temp_doc_id, None)
             
-            # Delete cache file
+            # Delete the per-request cache file; shared document files are
+            # handled below once no live entry references them
             cache_file = os.path.join(self.cache_dir, f"{temp_doc_id}.pdf")
-            if os.path.exists(cache_file):
-                try:
-                    os.remove(cache_file)
-                    cleaned_count += 1
-                    logger.debug(f"Deleted expired cache file: {cache_file}")
-                except OSError as e:
-                    logger.error(f"Failed to delete cache file {cache_file}: {e}")
+            try:
+                os.remove(cache_file)
+                cleaned_count += 1
+                logger.debug(f"Deleted expired cache file: {cache_file}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Failed to delete cache file {cache_file}: {e}")
+        
+        # Shared document files still referenced by a live entry
+        referenced_files = {
+            doc_info.get('cache_file') for doc_info in list(self.temp_documents.values())
+        }
         
         # Also clean orphan PDF files (files without corresponding temp_documents entry)
         for filename in os.listdir(self.cache_dir):
-            if filename.endswith('.pdf') and filename.startswith('temp_'):
-                temp_doc_id = filename[:-4]  # Remove .pdf extension
-                if temp_doc_id not in self.temp_documents:
-                    cache_file = os.path.join(self.cache_dir, filename)
-                    # Check file age
-                    try:
-                        file_mtime = datetime.fromtimestamp(os.path.getmtime(cache_file))
-                        if (datetime.now() - file_mtime).total_seconds() > self.duration_seconds:
-                            os.remove(cache_file)
-                            cleaned_count += 1
-                            logger.debug(f"Deleted orphan cache file: {cache_file}")
-                    except OSError as e:
-                        logger.error(f"Failed to process orphan file {cache_file}: {e}")
+            if not filename.endswith('.pdf'):
+                continue
+            if filename.startswith('temp_'):
+                orphan = filename[:-4] not in self.temp_documents  # Remove .pdf extension
+            else:
+                orphan = filename.startswith('doc_') and filename not in referenced_files
+            if orphan:
+                cache_file = os.path.join(self.cache_dir, filename)
+                # Check file age
+                try:
+                    file_mtime = datetime.fromtimestamp(os.path.getmtime(cache_file))
+                    if (datetime.now() - file_mtime).total_seconds() > self.duration_seconds:
+                        os.remove(cache_file)
+                        cleaned_count += 1
+                        logger.debug(f"Deleted orphan cache file: {cache_file}")
+                except OSError as e:
+                    logger.error(f"Failed to process orphan file {cache_file}: {e}")
         
         if expired_count > 0 or cleaned_count > 0:
             logger.info(f"Cache cleanup: {expired_count} expired documents, {cleaned_count} files deleted")
@@ -157,20 +173,15 @@ def init_cache_cleaner(app) -> CacheCleaner:
     """
     global _cache_cleaner
     
-    from app.routes.api import temp_documents
+    from app.routes.api import temp_documents, download_status
     
     config = app.config['CONFIG']
-    cache_dir_config = config.cache.get('directory', './cache')
     duration_seconds = config.cache.get('duration_seconds', 3600)
     
-    # Build absolute path
-    app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    cache_dir = os.path.join(app_root, cache_dir_config.lstrip('./'))
-    
-    # Create cache directory if it doesn't exist
-    os.makedirs(cache_dir, exist_ok=True)
+    # Resolved and created by the app factory
+    cache_dir = app.config['CACHE_DIR']
     
-    _cache_cleaner = CacheCleaner(cache_dir, duration_seconds, temp_documents)
+    _cache_cleaner = CacheCleaner(cache_dir, duration_seconds, temp_documents, download_status)
     _cache_cleaner.start()
     
     return _cache_cleaner
@@ -80,6 +80,33 @@ class LocalAnnotationsPlugin(AnnotationsPlugin):
         except Exception:
             return False
     
+    def save_annotations_bulk(self, items: list) -> bool:
+        """Save annotations for several documents, writing the file once.
+        
+        Args:
+            items: List of (user_id, document_id, annotations) tuples
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            now = datetime.utcnow().isoformat() + 'Z'
+            
+            for user_id, document_id, annotations in items:
+                key = self._get_key(user_id, document_id)
+                
+                # Add metadata
+                annotations['updated_at'] = now
+                if key not in self._annotations:
+                    annotations['created_at'] = now
+                
+                self._annotations[key] = annotations
+            
+            self._save_annotations_file()
+            return True
+        except Exception:
+            return False
+    
     def get_annotations(self, user_id: str, document_id: str) -> dict:
         """Retrieve annotations for a document.
         
@@ -78,6 +78,49 @@ class MongoDBAnnotationsPlugin(AnnotationsPlugin):
         except Exception:
             return False
     
+    def save_annotations_bulk(self, items: list) -> bool:
+        """Save annotations for several documents in a single bulk write.
+        
+        Args:
+            items: List of (user_id, document_id, annotations) tuples
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if self._collection is None:
+            return False
+        
+        if not items:
+            return True
+        
+        try:
+            from pymongo import UpdateOne
+            
+            now = datetime.utcnow()
+            
+            operations = [
+                UpdateOne(
+                    {'user_id': user_id, 'document_id': document_id},
+                    {
+                        '$set': {
+                            'notes': annotations.get('notes', []),
+                            'highlights': annotations.get('highlights', []),
+                            'updated_at': now
+                        },
+                        '$setOnInsert': {
+                            'created_at': now
+                        }
+                    },
+                    upsert=True
+                )
+                for user_id, document_id, annotations in items
+            ]
+            
+            result = self._collection.bulk_write(operations, ordered=False)
+            return result.acknowledged
+        except Exception:
+            return False
+    
     def get_annotations(self, user_id: str, document_id: str) -> dict:
         """Retrieve annotations for a document.
         
@@ -10,11 +10,14 @@ from app.plugins.base import AnnotationsPlugin
 try:
     import psycopg2
     from psycopg2 import pool
-    from psycopg2.extras import RealDictCursor, Json
+    from psycopg2.extras import RealDictCursor, Json, execute_values
     PSYCOPG2_AVAILABLE = True
 except ImportError:
     PSYCOPG2_AVAILABLE = False
 
+# Rows sent per INSERT statement by save_annotations_bulk
+BULK_PAGE_SIZE = 1000
+
 
 class PostgreSQLAnnotationsPlugin(AnnotationsPlugin):
     """Annotations plugin using PostgreSQL for storage.
@@ -207,6 +210,58 @@ class PostgreSQLAnnotationsPlugin(AnnotationsPlugin):
         finally:
             self._put_connection(conn)
     
+    def save_annotations_bulk(self, items: list) -> bool:
+        """Save annotations for several documents in a single statement.
+        
+        Args:
+            items: List of (user_id, document_id, annotations) tuples,
+                without duplicate (user_id, document_id) pairs
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not items:
+            return True
+        
+        conn = self._get_connection()
+        if not conn:
+            return False
+        
+        try:
+            with conn.cursor() as cur:
+                now = datetime.utcnow()
+                
+                # Multi-row upserts (BULK_PAGE_SIZE rows per statement), one commit
+                execute_values(cur, f'''
+                    INSERT INTO {self.table} (user_id, document_id, notes, highlights, created_at, updated_at)
+                    VALUES %s
+                    ON CONFLICT (user_id, document_id)
+                    DO UPDATE SET
+                        notes = EXCLUDED.notes,
+                        highlights = EXCLUDED.highlights,
+                        updated_at = EXCLUDED.updated_at
+                ''', [
+                    (
+                        user_id,
+                        document_id,
+                        Json(annotations.get('notes', [])),
+                        Json(annotations.get('highlights', [])),
+                        now,
+                        now
+                    )
+                    for user_id, document_id, annotations in items
+                ], page_size=BULK_PAGE_SIZE)
+                
+                conn.commit()
+                return True
+                
+        except psycopg2.Error as e:
+            print(f"Error saving annotations: {e}")
+            conn.rollback()
+            return False
+        finally:
+            self._put_connection(conn)
+    
     def get_annotations(self, user_id: str, document_id: str) -> dict:
         """Retrieve annotations for a document.
         
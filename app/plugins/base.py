@@ -1,7 +1,7 @@
 """Base classes for OpenMark plugins."""
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import BinaryIO, Optional, List, Tuple, Union
 
 
 class AuthenticationPlugin(ABC):
@@ -54,7 +54,12 @@ class AuthenticationPlugin(ABC):
 
 
 class PDFSourcePlugin(ABC):
-    """Base class for PDF source plugins."""
+    """Base class for PDF source plugins.
+    
+    get_document returns None for a missing document, so callers that are
+    going to fetch it anyway don't need a document_exists probe first:
+    that costs an extra round trip on network-backed sources.
+    """
     
     def __init__(self, config: dict):
         """Initialize the plugin with configuration.
@@ -65,14 +70,18 @@ class PDFSourcePlugin(ABC):
         self.config = config
     
     @abstractmethod
-    def get_document(self, document_id: str) -> Optional[bytes]:
+    def get_document(self, document_id: str) -> Optional[Union[bytes, bytearray]]:
         """Retrieve a PDF document.
         
+        Plugins that fill a preallocated buffer may return it as a bytearray
+        rather than copying it into bytes; callers must only rely on the
+        bytes-like interface.
+        
         Args:
             document_id: The document identifier
             
         Returns:
-            PDF bytes if found, None otherwise
+            PDF content (bytes or bytearray) if found, None otherwise
         """
         pass
     
@@ -87,6 +96,43 @@ class PDFSourcePlugin(ABC):
             True if document exists, False otherwise
         """
         pass
+    
+    def download_document(self, document_id: str, fileobj: BinaryIO) -> bool:
+        """Write a PDF document to a file object.
+        
+        The default implementation holds the whole document in memory;
+        plugins that can stream the download should override it.
+        
+        Args:
+            document_id: The document identifier
+            fileobj: Writable binary file object
+            
+        Returns:
+            True if the document was written, False if it wasn't found
+        """
+        content = self.get_document(document_id)
+        if content is None:
+            return False
+        fileobj.write(content)
+        return True
+    
+    def validate_pdf(self, document_id: str) -> bool:
+        """Check that a document exists and looks like a PDF.
+        
+        Every source applies the same rule: a document is valid when it
+        starts with the '%PDF' magic number. The trailer is not checked, so
+        a 4-byte read is enough. The default implementation downloads the
+        whole document; plugins that can read just the header should
+        override it.
+        
+        Args:
+            document_id: The document identifier
+            
+        Returns:
+            True if the document starts with the PDF magic number
+        """
+        content = self.get_document(document_id)
+        return content is not None and content[:4] == b'%PDF'
 
 
 class AnnotationsPlugin(ABC):
@@ -127,3 +173,21 @@ class AnnotationsPlugin(ABC):
             Dict containing 'notes' and 'highlights' lists
         """
         pass
+    
+    def save_annotations_bulk(self, items: List[Tuple[str, str, dict]]) -> bool:
+        """Save annotations for several documents at once.
+        
+        The default implementation saves the documents one by one; plugins
+        that can write them in a single round trip should override it.
+        
+        Args:
+            items: List of (user_id, document_id, annotations) tuples
+            
+        Returns:
+            True if every document was saved, False otherwise
+        """
+        success = True
+        for user_id, document_id, annotations in items:
+            if not self.save_annotations(user_id, document_id, annotations):
+                success = False
+        return success
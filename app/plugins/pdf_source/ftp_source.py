@@ -2,10 +2,13 @@
 
 import ftplib
 import io
-from typing import Optional, List
+from typing import Optional, List, BinaryIO
 
 from app.plugins.base import PDFSourcePlugin
 
+# Block size for RETR transfers (ftplib defaults to 8 KiB)
+RETR_BLOCKSIZE = 1 << 20
+
 
 class FTPSourcePlugin(PDFSourcePlugin):
     """PDF source plugin that retrieves documents from an FTP/FTPS server."""
@@ -108,14 +111,11 @@ class FTPSourcePlugin(PDFSourcePlugin):
             ftp = self._get_connection()
             
             try:
-                # Create a BytesIO buffer to store the file
-                buffer = io.BytesIO()
-                
-                # Download the file
-                ftp.retrbinary(f'RETR {path}', buffer.write)
-                
-                content = buffer.getvalue()
-                buffer.close()
+                # Collect the blocks and join them once at the exact final size,
+                # instead of letting a BytesIO grow geometrically
+                chunks: List[bytes] = []
+                ftp.retrbinary(f'RETR {path}', chunks.append, blocksize=RETR_BLOCKSIZE)
+                content = b''.join(chunks)
                 
                 # Verify it's a PDF
                 if content[:4] == b'%PDF':
@@ -127,22 +127,58 @@ class FTPSourcePlugin(PDFSourcePlugin):
             finally:
                 ftp.quit()
                 
-        except ftplib.error_perm as e:
-            error_code = str(e).split()[0] if str(e) else ''
+        except Exception as e:
+            self._report_fetch_error(document_id, e)
+            return None
+    
+    def download_document(self, document_id: str, fileobj: BinaryIO) -> bool:
+        """Write a PDF document from the FTP server to a file object.
+        
+        Blocks are written as they arrive instead of being joined in memory.
+        
+        Args:
+            document_id: The document identifier
+            fileobj: Writable binary file object
+            
+        Returns:
+            True if the document was written, False if it wasn't found
+        """
+        path = self._get_document_path(document_id)
+        
+        try:
+            ftp = self._get_connection()
+            
+            try:
+                ftp.retrbinary(f'RETR {path}', fileobj.write, blocksize=RETR_BLOCKSIZE)
+                return True
+            finally:
+                ftp.quit()
+                
+        except Exception as e:
+            self._report_fetch_error(document_id, e)
+            return False
+    
+    def _report_fetch_error(self, document_id: str, error: Exception):
+        """Log why a document could not be retrieved.
+        
+        Args:
+            document_id: The document identifier
+            error: Exception raised by the transfer
+        """
+        if isinstance(error, ftplib.error_perm):
+            # Reply codes are always the first three characters of the message
+            message = str(error)
+            error_code = message[:3] if message[:3].isdigit() else ''
             if error_code in ('550', '553'):
                 print(f"Document not found on FTP: {document_id}")
             else:
-                print(f"FTP permission error fetching {document_id}: {e}")
-            return None
-        except ftplib.error_temp as e:
-            print(f"FTP temporary error fetching {document_id}: {e}")
-            return None
-        except (ConnectionError, TimeoutError) as e:
-            print(f"FTP connection error fetching {document_id}: {e}")
-            return None
-        except Exception as e:
-            print(f"Unexpected error fetching {document_id} from FTP: {e}")
-            return None
+                print(f"FTP permission error fetching {document_id}: {error}")
+        elif isinstance(error, ftplib.error_temp):
+            print(f"FTP temporary error fetching {document_id}: {error}")
+        elif isinstance(error, (ConnectionError, TimeoutError)):
+            print(f"FTP connection error fetching {document_id}: {error}")
+        else:
+            print(f"Unexpected error fetching {document_id} from FTP: {error}")
     
     def document_exists(self, document_id: str) -> bool:
         """Check if a document exists on the FTP server.
@@ -1,6 +1,7 @@
 """HTTP-based PDF source plugin."""
 
-import os, time
+import os, tempfile, time
+from email.utils import formatdate
 from typing import Optional
 from urllib.parse import urljoin
 
@@ -16,13 +17,19 @@ class HTTPSourcePlugin(PDFSourcePlugin):
         """Initialize the HTTP source plugin.
         
         Args:
-            config: Plugin configuration with 'base_url', 'timeout', and optional 'headers'
+            config: Plugin configuration with 'base_url', 'timeout', and optional 'headers'.
+                Downloads are written through to 'local_path' unless 'cache_downloads'
+                is False; cached copies are revalidated (If-None-Match with their
+                ETag, If-Modified-Since with their mtime) once 'revalidate_seconds'
+                (default: 3600) have elapsed.
         """
         super().__init__(config)
         self.base_url = config.get('base_url', '')
         self.timeout = config.get('timeout', 30)
         self.headers = config.get('headers', {})
         self.local_path = config.get('local_path', './data/pdfs')
+        self.cache_downloads = config.get('cache_downloads', True)
+        self.revalidate_seconds = config.get('revalidate_seconds', 3600)
     
     def _get_document_url(self, document_id: str) -> str:
         """Build the full URL for a document.
@@ -40,18 +47,161 @@ class HTTPSourcePlugin(PDFSourcePlugin):
             return urljoin(self.base_url, document_id)
         return document_id
     
-    def _get_local_path(self, document_id: str) -> str:
+    def _get_local_path(self, document_id: str) -> Optional[str]:
         """Get local file path for a document.
         
         Args:
             document_id: The document identifier
             
         Returns:
-            Local file path
+            Local file path, or None if the document ID escapes local_path
         """
         if not document_id.endswith('.pdf'):
             document_id = f"{document_id}.pdf"
-        return os.path.join(self.local_path, document_id)
+        path = os.path.join(self.local_path, document_id)
+        
+        # Resolve to absolute path and check it stays within local_path
+        base_resolved = os.path.realpath(self.local_path)
+        if not os.path.realpath(path).startswith(base_resolved + os.sep):
+            print(f"Security warning: attempted access outside local path: {document_id}")
+            return None
+        return path
+    
+    def _read_etag(self, local_path: str) -> Optional[str]:
+        """Read the ETag stored alongside a downloaded document.
+        
+        Args:
+            local_path: Local file path of the cached document
+            
+        Returns:
+            ETag string, or None if the server sent none
+        """
+        try:
+            with open(f"{local_path}.etag", 'r', encoding='utf-8') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+    
+    def _is_downloaded(self, local_path: str) -> bool:
+        """Check whether a local copy was downloaded by this plugin.
+        
+        Downloaded copies always have a '.etag' file next to them (empty if
+        the server sent no ETag); other files in local_path are served as is.
+        
+        Args:
+            local_path: Local file path of the cached document
+            
+        Returns:
+            True if the copy must be revalidated with the server
+        """
+        return os.path.exists(f"{local_path}.etag")
+    
+    def _is_fresh(self, local_path: str) -> bool:
+        """Check whether a downloaded copy is still within its revalidation window.
+        
+        Args:
+            local_path: Local file path of the cached document
+            
+        Returns:
+            True if the copy can be served without contacting the server
+        """
+        try:
+            validated_at = os.path.getmtime(f"{local_path}.etag")
+        except OSError:
+            return False
+        return time.time() - validated_at < self.revalidate_seconds
+    
+    def _write_cache(self, local_path: str, content: bytes, etag: Optional[str]):
+        """Write a downloaded document (and its ETag) to the local path.
+        
+        The content is written to a uniquely named temporary file and renamed
+        into place, so concurrent readers never see a partial PDF and a file
+        left behind by a crash never blocks later writes.
+        
+        Args:
+            local_path: Local file path of the cached document
+            content: PDF bytes
+            etag: ETag returned by the server, if any
+        """
+        directory = os.path.dirname(local_path) or '.'
+        tmp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=directory, prefix=f"{os.path.basename(local_path)}.", suffix='.part'
+            )
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, local_path)
+            # Written last: its mtime marks when the copy was validated
+            with open(f"{local_path}.etag", 'w', encoding='utf-8') as f:
+                f.write(etag or '')
+        except OSError as e:
+            print(f"Warning: Could not cache document to {local_path}: {e}")
+            if tmp_path:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+    
+    def _fetch(self, document_id: str, local_path: Optional[str],
+               revalidate: bool = False) -> Optional[bytes]:
+        """Download a document, optionally revalidating the local copy.
+        
+        Args:
+            document_id: The document identifier
+            local_path: Local file path of the cached document (None disables caching)
+            revalidate: Send conditional headers for the existing local copy
+            
+        Returns:
+            PDF bytes if found, None otherwise
+        """
+        url = self._get_document_url(document_id)
+        headers = self.headers
+        if revalidate:
+            headers = dict(self.headers)
+            etag = self._read_etag(local_path)
+            if etag:
+                headers['If-None-Match'] = etag
+            try:
+                headers['If-Modified-Since'] = formatdate(os.path.getmtime(local_path), usegmt=True)
+            except OSError:
+                pass
+        
+        response = requests.get(
+            url,
+            headers=headers,
+            timeout=self.timeout,
+            allow_redirects=True  # Follow redirects (cross-domain included)
+        )
+        
+        if response.status_code == 304 and revalidate:
+            # Cached copy is still current: restart the revalidation window
+            try:
+                with open(local_path, 'rb') as f:
+                    content = f.read()
+                os.utime(f"{local_path}.etag")
+                return content
+            except OSError:
+                # The copy vanished or is unreadable: download it again
+                return self._fetch(document_id, local_path)
+        
+        if response.status_code == 200:
+            content = response.content
+            
+            # Verify it's actually a PDF
+            content_type = response.headers.get('Content-Type', '')
+            if 'pdf' in content_type.lower() or content[:4] == b'%PDF':
+                if self.cache_downloads and local_path:
+                    self._write_cache(local_path, content, response.headers.get('ETag'))
+            else:
+                # Not cached, so a fixed upstream document is picked up next time
+                print(f"Warning: Content-Type '{content_type}' may not be a PDF")
+            return content
+        
+        print(f"HTTP error {response.status_code} fetching document {document_id}")
+        return None
     
     def get_document(self, document_id: str) -> Optional[bytes]:
         """Retrieve a PDF document.
@@ -62,37 +212,28 @@ class HTTPSourcePlugin(PDFSourcePlugin):
         Returns:
             PDF bytes if found, None otherwise
         """
-        
-        # First try local path
         local_path = self._get_local_path(document_id)
+        if local_path is None:
+            return None
+        
+        # First try local path. Copies downloaded by this plugin are only
+        # served directly while they are within the revalidation window.
+        revalidate = False
         if os.path.exists(local_path):
-            try:
-                with open(local_path, 'rb') as f:
-                    return f.read()
-            except IOError:
-                pass
+            downloaded = self._is_downloaded(local_path)
+            if not downloaded or not self.base_url or self._is_fresh(local_path):
+                try:
+                    with open(local_path, 'rb') as f:
+                        return f.read()
+                except IOError:
+                    pass
+            else:
+                revalidate = True
         
         # Then try HTTP if base_url is configured
         if self.base_url:
             try:
-                url = self._get_document_url(document_id)
-                response = requests.get(
-                    url,
-                    headers=self.headers,
-                    timeout=self.timeout,
-                    allow_redirects=True  # Follow redirects (cross-domain included)
-                )
-                
-                if response.status_code == 200:
-                    # Verify it's actually a PDF
-                    content_type = response.headers.get('Content-Type', '')
-                    if 'pdf' in content_type.lower() or response.content[:4] == b'%PDF':
-                        return response.content
-                    else:
-                        print(f"Warning: Content-Type '{content_type}' may not be a PDF")
-                        return response.content
-                else:
-                    print(f"HTTP error {response.status_code} fetching document {document_id}")
+                return self._fetch(document_id, local_path, revalidate)
             except requests.Timeout:
                 print(f"Timeout fetching document {document_id} from {self.base_url}")
             except requests.ConnectionError as e:
@@ -113,6 +254,8 @@ class HTTPSourcePlugin(PDFSourcePlugin):
         """
         # First check local path
         local_path = self._get_local_path(document_id)
+        if local_path is None:
+            return False
         if os.path.exists(local_path):
             return True
         
@@ -130,3 +273,45 @@ class HTTPSourcePlugin(PDFSourcePlugin):
                 pass
         
         return False
+    
+    def validate_pdf(self, document_id: str) -> bool:
+        """Check a document's PDF magic number without downloading it.
+        
+        Local copies are checked by reading their first 4 bytes; remote
+        documents are checked with a 'Range: bytes=0-3' request.
+        
+        Args:
+            document_id: The document identifier
+            
+        Returns:
+            True if the document starts with '%PDF'
+        """
+        local_path = self._get_local_path(document_id)
+        if local_path is None:
+            return False
+        try:
+            with open(local_path, 'rb') as f:
+                return f.read(4) == b'%PDF'
+        except OSError:
+            pass
+        
+        if not self.base_url:
+            return False
+        
+        try:
+            response = requests.get(
+                self._get_document_url(document_id),
+                headers={**self.headers, 'Range': 'bytes=0-3'},
+                timeout=self.timeout,
+                allow_redirects=True,
+                stream=True
+            )
+            try:
+                if response.status_code not in (200, 206):
+                    return False
+                # Servers ignoring Range answer 200 with the full body; only read the head
+                return response.raw.read(4) == b'%PDF'
+            finally:
+                response.close()
+        except requests.RequestException:
+            return False
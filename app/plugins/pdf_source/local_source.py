@@ -2,11 +2,15 @@
 
 import os
 import glob
+import shutil
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict, BinaryIO
 
 from app.plugins.base import PDFSourcePlugin
 
+# Chunk size when copying a document to a file object
+COPY_CHUNK_SIZE = 1 << 20
+
 
 class LocalSourcePlugin(PDFSourcePlugin):
     """PDF source plugin that retrieves documents from the local filesystem."""
@@ -20,12 +24,19 @@ class LocalSourcePlugin(PDFSourcePlugin):
                 - recursive: Search subdirectories recursively (default: False)
                 - allowed_extensions: List of allowed file extensions (default: ['.pdf'])
                 - create_base_path: Create base_path if it doesn't exist (default: True)
+                - build_index: Resolve recursive lookups from a filename index
+                  instead of walking the tree on every call (default: True)
         """
         super().__init__(config)
         self.base_path = config.get('base_path', './data/pdfs')
         self.recursive = config.get('recursive', False)
         self.allowed_extensions = config.get('allowed_extensions', ['.pdf'])
         self.create_base_path = config.get('create_base_path', True)
+        self.build_index = config.get('build_index', True)
+        
+        # Filename -> path index for recursive lookups (built lazily)
+        self._index: Optional[Dict[str, str]] = None
+        self._index_mtime = 0.0
         
         # Normalize base path
         self.base_path = os.path.abspath(os.path.expanduser(self.base_path))
@@ -98,37 +109,163 @@ class LocalSourcePlugin(PDFSourcePlugin):
             print(f"Invalid file extension for document: {document_id}")
             return None
         
-        # Check if file exists
-        if not os.path.isfile(file_path):
-            # Try recursive search if enabled
-            if self.recursive:
-                found_path = self._find_document_recursive(document_id)
-                if found_path:
-                    file_path = found_path
-                else:
+        # Open directly: the open itself tells us whether the file exists,
+        # saving a separate stat on the common path
+        try:
+            try:
+                content = self._read_file(file_path)
+            except (FileNotFoundError, IsADirectoryError):
+                # Try recursive search if enabled
+                found_path = self._find_document_recursive(document_id) if self.recursive else None
+                if not found_path:
                     print(f"Document not found: {document_id}")
                     return None
-            else:
-                print(f"Document not found: {document_id}")
-                return None
+                content = self._read_file(found_path)
+        except PermissionError as e:
+            print(f"Permission denied reading document {document_id}: {e}")
+            return None
+        except OSError as e:
+            print(f"Error reading document {document_id}: {e}")
+            return None
+        
+        # Verify it's a PDF
+        if content[:4] != b'%PDF':
+            print(f"Warning: File {document_id} may not be a valid PDF")
+        return content
+    
+    def download_document(self, document_id: str, fileobj: BinaryIO) -> bool:
+        """Copy a PDF document from the local filesystem to a file object.
+        
+        The file is copied in chunks instead of being read into memory.
+        
+        Args:
+            document_id: The document identifier
+            fileobj: Writable binary file object
+            
+        Returns:
+            True if the document was written, False if it wasn't found
+        """
+        file_path = self._get_document_path(document_id)
+        
+        # Security check: ensure path doesn't escape base directory
+        if not self._is_safe_path(file_path):
+            print(f"Security warning: attempted access outside base path: {document_id}")
+            return False
+        
+        # Validate extension
+        if not self._validate_extension(file_path):
+            print(f"Invalid file extension for document: {document_id}")
+            return False
         
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
+            try:
+                src = open(file_path, 'rb')
+            except (FileNotFoundError, IsADirectoryError):
+                # Try recursive search if enabled
+                found_path = self._find_document_recursive(document_id) if self.recursive else None
+                if not found_path:
+                    print(f"Document not found: {document_id}")
+                    return False
+                src = open(found_path, 'rb')
             
-            # Verify it's a PDF
-            if content[:4] == b'%PDF':
-                return content
-            else:
-                print(f"Warning: File {document_id} may not be a valid PDF")
-                return content
-                
-        except IOError as e:
-            print(f"Error reading document {document_id}: {e}")
-            return None
+            with src:
+                shutil.copyfileobj(src, fileobj, COPY_CHUNK_SIZE)
         except PermissionError as e:
             print(f"Permission denied reading document {document_id}: {e}")
-            return None
+            return False
+        except OSError as e:
+            print(f"Error reading document {document_id}: {e}")
+            return False
+        
+        return True
+    
+    def validate_pdf(self, document_id: str) -> bool:
+        """Check a document's PDF magic number without reading it fully.
+        
+        Only the first 4 bytes are read.
+        
+        Args:
+            document_id: The document identifier
+            
+        Returns:
+            True if the file starts with '%PDF'
+        """
+        file_path = self._get_document_path(document_id)
+        
+        if not self._is_safe_path(file_path) or not self._validate_extension(file_path):
+            return False
+        
+        if self.recursive and not os.path.isfile(file_path):
+            file_path = self._find_document_recursive(document_id)
+            if not file_path:
+                return False
+        
+        try:
+            with open(file_path, 'rb', buffering=0) as f:
+                return f.read(4) == b'%PDF'
+        except OSError:
+            return False
+    
+    def _read_file(self, file_path: str) -> bytes:
+        """Read a whole file in one unbuffered call.
+        
+        The returned bytes are handed to the caller as-is, so Python's
+        buffered IO layer would only add an extra copy.
+        
+        Args:
+            file_path: Full path of the file to read
+            
+        Returns:
+            File content
+            
+        Raises:
+            OSError: If the file cannot be opened or read
+        """
+        with open(file_path, 'rb', buffering=0) as f:
+            return f.readall()
+    
+    def _build_index(self) -> Dict[str, str]:
+        """Walk base_path once and map every filename to its full path.
+        
+        Returns:
+            Dict of filename -> full path (first match wins, like glob)
+        """
+        index: Dict[str, str] = {}
+        pending = [self.base_path]
+        
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file():
+                            index.setdefault(entry.name, entry.path)
+            except OSError:
+                continue
+        
+        return index
+    
+    def _ensure_index(self, force: bool = False) -> Dict[str, str]:
+        """Return the filename index, rebuilding it if base_path changed.
+        
+        Args:
+            force: Rebuild even if base_path's mtime is unchanged
+            
+        Returns:
+            Filename -> path index
+        """
+        try:
+            mtime = os.stat(self.base_path).st_mtime
+        except OSError:
+            mtime = 0.0
+        
+        if force or self._index is None or mtime > self._index_mtime:
+            self._index = self._build_index()
+            self._index_mtime = mtime
+        
+        return self._index
     
     def _find_document_recursive(self, document_id: str) -> Optional[str]:
         """Search for a document recursively in subdirectories.
@@ -145,6 +282,15 @@ class LocalSourcePlugin(PDFSourcePlugin):
         else:
             filename = document_id
         
+        # The index is keyed by bare filename; ids with a directory part use glob
+        if self.build_index and '/' not in filename and os.sep not in filename:
+            path = self._ensure_index().get(filename)
+            if path is not None and os.path.isfile(path):
+                return path
+            # Changes inside subdirectories don't touch base_path's mtime,
+            # so a miss (or stale hit) triggers a single rebuild
+            return self._ensure_index(force=True).get(filename)
+        
         # Search recursively
         pattern = os.path.join(self.base_path, '**', filename)
         matches = glob.glob(pattern, recursive=True)
@@ -1,10 +1,58 @@
 """S3-based PDF source plugin."""
 
+import itertools
+import logging
 import os
-from typing import Optional
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union, Iterator
 
 from app.plugins.base import PDFSourcePlugin
 
+logger = logging.getLogger(__name__)
+
+# botocore is only needed once the plugin is used; import its exceptions once
+# here rather than on every call (boto3 itself is still loaded lazily)
+try:
+    from botocore.exceptions import ClientError
+    BOTO3_AVAILABLE = True
+except ImportError:
+    BOTO3_AVAILABLE = False
+
+
+# Every casing of the '.pdf' extension, so that listing loops can test
+# names with endswith() instead of lowercasing each one
+PDF_SUFFIXES = tuple(
+    ''.join(chars) for chars in itertools.product('.', 'pP', 'dD', 'fF')
+)
+
+# Size of the chunks read from response bodies
+STREAM_CHUNK_SIZE = 1 << 16
+
+
+def _parse_timestamp(value):
+    """Parse a timestamp from an S3 response.
+    
+    Listings carry ISO 8601 timestamps, which datetime.fromisoformat parses
+    far faster than botocore's dateutil-based default. Anything else (e.g.
+    the HTTP date of a HEAD response) falls back to botocore's parser.
+    
+    Args:
+        value: Raw timestamp from the response
+        
+    Returns:
+        Timezone-aware datetime
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is not None:
+            return parsed
+    except (TypeError, ValueError):
+        pass
+    
+    from botocore.utils import parse_timestamp
+    return parse_timestamp(value)
+
 
 class S3SourcePlugin(PDFSourcePlugin):
     """PDF source plugin that retrieves documents from AWS S3 bucket."""
@@ -23,6 +71,16 @@ class S3SourcePlugin(PDFSourcePlugin):
                 - endpoint_url: Custom S3 endpoint (optional, for S3-compatible services like MinIO)
                 - use_ssl: Use SSL for connections (default: True)
                 - verify_ssl: Verify SSL certificates (default: True)
+                - max_pool_connections: Size of the client's keep-alive connection
+                  pool, shared by all threads (default: 64)
+                - max_concurrency: Worker threads used for ranged downloads of
+                  large documents (default: 8)
+                - range_chunk_size: Documents larger than this many bytes are downloaded
+                  as concurrent range requests of this size (default: 16 MiB)
+                - connect_timeout: Seconds to wait for a connection (default: 3)
+                - read_timeout: Seconds to wait for data on a socket (default: 30)
+                - max_attempts: Attempts per request, retried with adaptive
+                  backoff on throttling (default: 10)
         """
         super().__init__(config)
         self.bucket_name = config.get('bucket_name')
@@ -37,6 +95,15 @@ class S3SourcePlugin(PDFSourcePlugin):
         self.endpoint_url = config.get('endpoint_url')
         self.use_ssl = config.get('use_ssl', True)
         self.verify_ssl = config.get('verify_ssl', True)
+        self.max_pool_connections = config.get('max_pool_connections', 64)
+        self.max_concurrency = config.get('max_concurrency', 8)
+        self.range_chunk_size = config.get('range_chunk_size', 16 * 1024 * 1024)
+        self.connect_timeout = config.get('connect_timeout', 3)
+        self.read_timeout = config.get('read_timeout', 30)
+        self.max_attempts = config.get('max_attempts', 10)
+        
+        # Length of "prefix/" stripped from listed keys
+        self._prefix_offset = len(self.prefix.rstrip('/')) + 1 if self.prefix else 0
         
         # Initialize S3 client lazily
         self._s3_client = None
@@ -50,7 +117,10 @@ class S3SourcePlugin(PDFSourcePlugin):
         """
         if self._s3_client is None:
             try:
+                if not BOTO3_AVAILABLE:
+                    raise ImportError
                 import boto3
+                import botocore.session
                 from botocore.config import Config as BotoConfig
             except ImportError:
                 raise ImportError(
@@ -58,12 +128,31 @@ class S3SourcePlugin(PDFSourcePlugin):
                     "Install it with: pip install boto3"
                 )
             
-            # Build client configuration
+            # Build client configuration. The client is thread-safe and kept for
+            # the plugin's lifetime, so size its pool for concurrent callers.
+            # Adaptive mode adds client-side rate limiting on top of the
+            # exponential backoff, so throttled partitions recover faster
             boto_config = BotoConfig(
                 signature_version='s3v4',
-                retries={'max_attempts': 3, 'mode': 'standard'}
+                retries={'max_attempts': self.max_attempts, 'mode': 'adaptive'},
+                connect_timeout=self.connect_timeout,
+                read_timeout=self.read_timeout,
+                max_pool_connections=self.max_pool_connections,
+                tcp_keepalive=True,
+                # Request parameters are built by this plugin, so skip the
+                # per-call schema walk of parameter validation
+                parameter_validation=False
             )
             
+            # Parse response timestamps with the stdlib instead of dateutil.
+            # The botocore session is our own, so the parser defaults set on
+            # it don't leak into other boto3 users of the process.
+            botocore_session = botocore.session.get_session()
+            botocore_session.get_component('response_parser_factory').set_parser_defaults(
+                timestamp_parser=_parse_timestamp
+            )
+            session = boto3.session.Session(botocore_session=botocore_session)
+            
             # Build client kwargs
             client_kwargs = {
                 'service_name': 's3',
@@ -84,7 +173,7 @@ class S3SourcePlugin(PDFSourcePlugin):
             if self.endpoint_url:
                 client_kwargs['endpoint_url'] = self.endpoint_url
             
-            self._s3_client = boto3.client(**client_kwargs)
+            self._s3_client = session.client(**client_kwargs)
         
         return self._s3_client
     
@@ -108,54 +197,135 @@ class S3SourcePlugin(PDFSourcePlugin):
             return f"{prefix}/{document_id}"
         return document_id
     
-    def get_document(self, document_id: str) -> Optional[bytes]:
+    def get_document(self, document_id: str) -> Optional[Union[bytes, bytearray]]:
         """Retrieve a PDF document from S3.
         
         Args:
             document_id: The document identifier
             
         Returns:
-            PDF bytes if found, None otherwise
+            PDF content (bytes or bytearray) if found, None otherwise
         """
-        try:
-            from botocore.exceptions import ClientError
-        except ImportError:
-            raise ImportError(
-                "boto3 is required for S3 PDF source plugin. "
-                "Install it with: pip install boto3"
-            )
+        # Raises ImportError if boto3 is missing
+        s3_client = self.s3_client
         
         s3_key = self._get_s3_key(document_id)
         
         try:
-            response = self.s3_client.get_object(
-                Bucket=self.bucket_name,
-                Key=s3_key
-            )
-            
-            content = response['Body'].read()
+            # Ask for the first chunk only: small documents arrive whole, and
+            # for large ones Content-Range reveals the size without a HEAD
+            try:
+                response = s3_client.get_object(
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    Range=f"bytes=0-{self.range_chunk_size - 1}"
+                )
+            except ClientError as e:
+                # Empty objects can't satisfy any range
+                if e.response.get('Error', {}).get('Code', '') != 'InvalidRange':
+                    raise
+                response = s3_client.get_object(
+                    Bucket=self.bucket_name,
+                    Key=s3_key
+                )
             
-            # Verify it's a PDF
+            # Peek at the magic number first so mis-typed objects are rejected
+            # without downloading them
+            body = response['Body']
             content_type = response.get('ContentType', '')
-            if 'pdf' in content_type.lower() or content[:4] == b'%PDF':
-                return content
-            else:
-                print(f"Warning: Content-Type '{content_type}' may not be a PDF for {s3_key}")
-                return content
+            head = body.read(4)
+            if 'pdf' not in content_type.lower() and not head.startswith(b'%PDF'):
+                body.close()
+                logger.warning("Object %s is not a PDF (Content-Type '%s')", s3_key, content_type)
+                return None
+            
+            total_size = self._parse_total_size(response.get('ContentRange'))
+            if total_size is None:
+                total_size = response.get('ContentLength')
+            if total_size is None:
+                return head + body.read()
+            
+            # Stream the body (and any remaining ranges) straight into a
+            # buffer allocated at the final size
+            buffer = bytearray(total_size)
+            view = memoryview(buffer)
+            view[:len(head)] = head
+            offset = len(head)
+            for chunk in body.iter_chunks(STREAM_CHUNK_SIZE):
+                view[offset:offset + len(chunk)] = chunk
+                offset += len(chunk)
+            
+            if offset < total_size:
+                self._get_remaining_ranges(s3_key, view, offset, response.get('ETag'))
+            
+            view.release()
+            # Returned as is: copying into an immutable bytes would double
+            # the peak memory
+            return buffer
                 
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', '')
             if error_code == 'NoSuchKey':
-                print(f"Document not found in S3: {s3_key}")
+                logger.warning("Document not found in S3: %s", s3_key)
             elif error_code == 'AccessDenied':
-                print(f"Access denied to S3 object: {s3_key}")
+                logger.warning("Access denied to S3 object: %s", s3_key)
             else:
-                print(f"S3 error fetching document {s3_key}: {e}")
+                logger.error("S3 error fetching document %s: %s", s3_key, e)
             return None
         except Exception as e:
-            print(f"Unexpected error fetching document {s3_key} from S3: {e}")
+            logger.error("Unexpected error fetching document %s from S3: %s", s3_key, e)
             return None
     
+    @staticmethod
+    def _parse_total_size(content_range: Optional[str]) -> Optional[int]:
+        """Extract the object size from a 'bytes start-end/total' header.
+        
+        Args:
+            content_range: Content-Range header value (None if absent)
+            
+        Returns:
+            Total object size, or None if unknown
+        """
+        if not content_range:
+            return None
+        _, _, total = content_range.rpartition('/')
+        return int(total) if total.isdigit() else None
+    
+    def _get_remaining_ranges(self, s3_key: str, view: memoryview,
+                              start_offset: int, etag: Optional[str]):
+        """Download the rest of a large object as concurrent range requests.
+        
+        Each range is written straight into its slot of the caller's buffer,
+        which is allocated at the final size. Ranges are pinned to the first
+        chunk's ETag so a concurrent overwrite can't produce a mixed document.
+        
+        Args:
+            s3_key: The object key
+            view: Writable view over a buffer of the full object size
+            start_offset: Number of bytes already received
+            etag: ETag of the first response
+        """
+        total_size = len(view)
+        
+        def fetch_range(start: int):
+            end = min(start + self.range_chunk_size, total_size) - 1
+            range_kwargs = {'IfMatch': etag} if etag else {}
+            response = self.s3_client.get_object(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Range=f"bytes={start}-{end}",
+                **range_kwargs
+            )
+            offset = start
+            for chunk in response['Body'].iter_chunks(STREAM_CHUNK_SIZE):
+                view[offset:offset + len(chunk)] = chunk
+                offset += len(chunk)
+        
+        starts = range(start_offset, total_size, self.range_chunk_size)
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(starts))) as executor:
+            # list() re-raises the first failed range
+            list(executor.map(fetch_range, starts))
+    
     def document_exists(self, document_id: str) -> bool:
         """Check if a document exists in S3.
         
@@ -165,18 +335,13 @@ class S3SourcePlugin(PDFSourcePlugin):
         Returns:
             True if document exists, False otherwise
         """
-        try:
-            from botocore.exceptions import ClientError
-        except ImportError:
-            raise ImportError(
-                "boto3 is required for S3 PDF source plugin. "
-                "Install it with: pip install boto3"
-            )
+        # Raises ImportError if boto3 is missing
+        s3_client = self.s3_client
         
         s3_key = self._get_s3_key(document_id)
         
         try:
-            self.s3_client.head_object(
+            s3_client.head_object(
                 Bucket=self.bucket_name,
                 Key=s3_key
             )
@@ -186,68 +351,70 @@ class S3SourcePlugin(PDFSourcePlugin):
             if error_code in ('404', 'NoSuchKey'):
                 return False
             # Log other errors but return False
-            print(f"S3 error checking document existence {s3_key}: {e}")
+            logger.error("S3 error checking document existence %s: %s", s3_key, e)
             return False
         except Exception as e:
-            print(f"Unexpected error checking document existence {s3_key}: {e}")
+            logger.error("Unexpected error checking document existence %s: %s", s3_key, e)
             return False
     
-    def list_documents(self, max_results: int = 100) -> list:
-        """List available documents in the S3 bucket.
+    def iter_documents(self, prefix_suffix: str = '', max_results: Optional[int] = None) -> Iterator[str]:
+        """Lazily iterate over the documents in the S3 bucket.
+        
+        Pages are requested only as the caller consumes them, so memory use
+        stays constant regardless of the bucket size.
         
         Args:
-            max_results: Maximum number of documents to return (default: 100)
+            prefix_suffix: Sub-path below the configured prefix to list (optional)
+            max_results: Maximum number of documents to yield (None for all)
             
-        Returns:
-            List of document IDs (without .pdf extension)
+        Yields:
+            Document IDs (without .pdf extension)
         """
-        try:
-            from botocore.exceptions import ClientError
-        except ImportError:
-            raise ImportError(
-                "boto3 is required for S3 PDF source plugin. "
-                "Install it with: pip install boto3"
-            )
+        # Raises ImportError if boto3 is missing
+        paginator = self.s3_client.get_paginator('list_objects_v2')
         
-        documents = []
+        page_size = min(max_results, 1000) if max_results else 1000
+        list_kwargs = {
+            'Bucket': self.bucket_name,
+            'PaginationConfig': {'PageSize': page_size}
+        }
+        
+        if prefix_suffix:
+            base = self.prefix.rstrip('/')
+            list_kwargs['Prefix'] = f"{base}/{prefix_suffix.lstrip('/')}" if base else prefix_suffix.lstrip('/')
+        elif self.prefix:
+            list_kwargs['Prefix'] = self.prefix
         
         try:
-            paginator = self.s3_client.get_paginator('list_objects_v2')
-            
-            list_kwargs = {
-                'Bucket': self.bucket_name,
-                'MaxKeys': min(max_results, 1000)
-            }
-            
-            if self.prefix:
-                list_kwargs['Prefix'] = self.prefix
-            
+            # MaxItems would also count non-PDF keys, so the cutoff is applied here
+            count = 0
             for page in paginator.paginate(**list_kwargs):
                 for obj in page.get('Contents', []):
                     key = obj['Key']
                     # Only include PDF files
-                    if key.lower().endswith('.pdf'):
-                        # Remove prefix and .pdf extension
-                        doc_id = key
-                        if self.prefix:
-                            doc_id = doc_id[len(self.prefix):].lstrip('/')
-                        doc_id = doc_id[:-4]  # Remove .pdf
-                        documents.append(doc_id)
+                    if key.endswith(PDF_SUFFIXES):
+                        # Remove prefix and .pdf extension in a single slice
+                        yield key[self._prefix_offset:-4]
                         
-                        if len(documents) >= max_results:
-                            break
+                        count += 1
+                        if max_results is not None and count >= max_results:
+                            return
                 
-                if len(documents) >= max_results:
-                    break
-            
-            return documents
-            
         except ClientError as e:
-            print(f"S3 error listing documents: {e}")
-            return []
+            logger.error("S3 error listing documents: %s", e)
         except Exception as e:
-            print(f"Unexpected error listing documents from S3: {e}")
-            return []
+            logger.error("Unexpected error listing documents from S3: %s", e)
+    
+    def list_documents(self, max_results: int = 100) -> list:
+        """List available documents in the S3 bucket.
+        
+        Args:
+            max_results: Maximum number of documents to return (default: 100)
+            
+        Returns:
+            List of document IDs (without .pdf extension)
+        """
+        return list(self.iter_documents(max_results=max_results))
     
     def get_document_metadata(self, document_id: str) -> Optional[dict]:
         """Get metadata for a document in S3.
@@ -258,18 +425,13 @@ class S3SourcePlugin(PDFSourcePlugin):
         Returns:
             Dict with document metadata, or None if not found
         """
-        try:
-            from botocore.exceptions import ClientError
-        except ImportError:
-            raise ImportError(
-                "boto3 is required for S3 PDF source plugin. "
-                "Install it with: pip install boto3"
-            )
+        # Raises ImportError if boto3 is missing
+        s3_client = self.s3_client
         
         s3_key = self._get_s3_key(document_id)
         
         try:
-            response = self.s3_client.head_object(
+            response = s3_client.head_object(
                 Bucket=self.bucket_name,
                 Key=s3_key
             )
@@ -288,8 +450,8 @@ class S3SourcePlugin(PDFSourcePlugin):
             error_code = e.response.get('Error', {}).get('Code', '')
             if error_code in ('404', 'NoSuchKey'):
                 return None
-            print(f"S3 error getting document metadata {s3_key}: {e}")
+            logger.error("S3 error getting document metadata %s: %s", s3_key, e)
             return None
         except Exception as e:
-            print(f"Unexpected error getting document metadata {s3_key}: {e}")
+            logger.error("Unexpected error getting document metadata %s: %s", s3_key, e)
             return None
@@ -1,11 +1,30 @@
 """SFTP-based PDF source plugin (SSH File Transfer Protocol)."""
 
 import io
+import itertools
+import logging
 import stat
-from typing import Optional, List
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional, Union, List
 
 from app.plugins.base import PDFSourcePlugin
 
+logger = logging.getLogger(__name__)
+
+# Every casing of the '.pdf' extension, so that listing loops can test
+# names with endswith() instead of lowercasing each one
+PDF_SUFFIXES = tuple(
+    ''.join(chars) for chars in itertools.product('.', 'pP', 'dD', 'fF')
+)
+
+# Size of the reads issued when downloading a document
+READ_CHUNK_SIZE = 1 << 20
+
+# SSH channel window (paramiko defaults to 2 MiB)
+SSH_WINDOW_SIZE = 1 << 27
+
 
 class SFTPSourcePlugin(PDFSourcePlugin):
     """PDF source plugin that retrieves documents from an SFTP server via SSH."""
@@ -26,6 +45,10 @@ class SFTPSourcePlugin(PDFSourcePlugin):
                 - known_hosts_path: Path to known_hosts file (optional)
                 - auto_add_host_key: Auto-add unknown host keys (default: False, set True only for dev)
                 - compress: Enable SSH compression (default: False)
+                - max_concurrency: Maximum SFTP channels opened over the shared SSH
+                  connection, i.e. concurrent transfers (default: 4)
+                - keepalive_interval: Seconds between SSH keepalives on the cached
+                  connection, 0 to disable (default: 30)
         """
         super().__init__(config)
         self.host = config.get('host')
@@ -45,6 +68,8 @@ class SFTPSourcePlugin(PDFSourcePlugin):
         self.known_hosts_path = config.get('known_hosts_path')
         self.auto_add_host_key = config.get('auto_add_host_key', False)
         self.compress = config.get('compress', False)
+        self.max_concurrency = config.get('max_concurrency', 4)
+        self.keepalive_interval = config.get('keepalive_interval', 30)
         
         # Normalize prefix
         if self.prefix and not self.prefix.startswith('/'):
@@ -52,9 +77,67 @@ class SFTPSourcePlugin(PDFSourcePlugin):
         if self.prefix and self.prefix.endswith('/'):
             self.prefix = self.prefix.rstrip('/')
         
-        # Lazy initialization
+        # Lazy initialization: one SSH connection is opened on first use and
+        # kept for later calls. SFTPClient isn't reentrant, so concurrent
+        # callers each borrow their own SFTP channel multiplexed over it.
         self._client = None
-        self._sftp = None
+        self._idle_channels = []
+        self._open_channels = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        # Signalled whenever a channel is returned or a slot in the pool frees up
+        self._channel_available = threading.Condition(self._lock)
+        
+        # Private key, parsed once on first connect
+        self._pkey = None
+    
+    def _load_private_key(self, paramiko):
+        """Load the configured private key, parsing the file only once.
+        
+        Args:
+            paramiko: The imported paramiko module
+            
+        Returns:
+            paramiko.PKey instance
+            
+        Raises:
+            ValueError: If the key can't be loaded
+        """
+        if self._pkey is not None:
+            return self._pkey
+        
+        passphrase = self.private_key_passphrase or None
+        try:
+            if hasattr(paramiko.PKey, 'from_path'):
+                # paramiko >= 3.2 detects the key type in a single pass
+                key = paramiko.PKey.from_path(self.private_key_path, passphrase=passphrase)
+            else:
+                key = None
+                key_types = [
+                    paramiko.RSAKey,
+                    paramiko.Ed25519Key,
+                    paramiko.ECDSAKey,
+                    paramiko.DSSKey
+                ]
+                
+                for key_class in key_types:
+                    try:
+                        key = key_class.from_private_key_file(
+                            self.private_key_path,
+                            password=passphrase
+                        )
+                        break
+                    except paramiko.SSHException:
+                        continue
+                
+                if not key:
+                    raise ValueError(f"Could not load private key from {self.private_key_path}")
+                    
+        except Exception as e:
+            raise ValueError(f"Error loading private key: {e}")
+        
+        self._pkey = key
+        return key
     
     def _get_connection(self):
         """Create and return an SFTP connection.
@@ -77,7 +160,7 @@ class SFTPSourcePlugin(PDFSourcePlugin):
             try:
                 client.load_host_keys(self.known_hosts_path)
             except Exception as e:
-                print(f"Warning: Could not load known_hosts: {e}")
+                logger.warning("Could not load known_hosts: %s", e)
         
         if self.auto_add_host_key:
             client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
@@ -102,42 +185,20 @@ class SFTPSourcePlugin(PDFSourcePlugin):
         
         # Authentication: private key or password
         if self.private_key_path:
-            try:
-                # Try to load the private key
-                key = None
-                key_types = [
-                    paramiko.RSAKey,
-                    paramiko.Ed25519Key,
-                    paramiko.ECDSAKey,
-                    paramiko.DSSKey
-                ]
-                
-                for key_class in key_types:
-                    try:
-                        if self.private_key_passphrase:
-                            key = key_class.from_private_key_file(
-                                self.private_key_path,
-                                password=self.private_key_passphrase
-                            )
-                        else:
-                            key = key_class.from_private_key_file(self.private_key_path)
-                        break
-                    except paramiko.SSHException:
-                        continue
-                
-                if key:
-                    connect_kwargs['pkey'] = key
-                else:
-                    raise ValueError(f"Could not load private key from {self.private_key_path}")
-                    
-            except Exception as e:
-                raise ValueError(f"Error loading private key: {e}")
+            connect_kwargs['pkey'] = self._load_private_key(paramiko)
         
         if self.password:
             connect_kwargs['password'] = self.password
         
         try:
             client.connect(**connect_kwargs)
+            
+            # Channels opened from here on (SFTP included) advertise a large
+            # window, so many reads can be in flight on high-latency links
+            transport = client.get_transport()
+            if transport:
+                transport.default_window_size = SSH_WINDOW_SIZE
+            
             sftp = client.open_sftp()
             return client, sftp
         except Exception as e:
@@ -159,6 +220,117 @@ class SFTPSourcePlugin(PDFSourcePlugin):
         except:
             pass
     
+    def _is_connected(self) -> bool:
+        """Check whether the cached SSH connection is still usable.
+        
+        Returns:
+            True if the cached transport is active
+        """
+        if self._client is None:
+            return False
+        transport = self._client.get_transport()
+        return transport is not None and transport.is_active()
+    
+    def _reset_pool(self):
+        """Close the SSH connection and all idle channels (lock must be held).
+        
+        Channels still borrowed belong to the previous generation and are
+        closed when they are released.
+        """
+        while self._idle_channels:
+            self._close_connection(None, self._idle_channels.pop())
+        
+        self._close_connection(self._client, None)
+        self._client = None
+        self._open_channels = 0
+        self._generation += 1
+        
+        # Waiters can now reconnect or open a channel in the emptied pool
+        self._channel_available.notify_all()
+    
+    def _acquire_channel(self):
+        """Borrow an SFTP channel, connecting or opening a channel if needed.
+        
+        Returns:
+            Tuple of (generation, SFTPClient)
+            
+        Raises:
+            TimeoutError: If every channel stays busy for 'timeout' seconds
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._channel_available:
+            while True:
+                if not self._is_connected():
+                    self._reset_pool()
+                    self._client, sftp = self._get_connection()
+                    self._open_channels = 1
+                    
+                    transport = self._client.get_transport()
+                    if transport and self.keepalive_interval:
+                        transport.set_keepalive(self.keepalive_interval)
+                    return self._generation, sftp
+                
+                if self._idle_channels:
+                    return self._generation, self._idle_channels.pop()
+                
+                if self._open_channels < self.max_concurrency:
+                    sftp = self._client.open_sftp()
+                    self._open_channels += 1
+                    return self._generation, sftp
+                
+                # Every channel is busy: wait for one to be released
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError("Timed out waiting for a free SFTP channel")
+                self._channel_available.wait(remaining)
+    
+    def _release_channel(self, generation: int, sftp, broken: bool = False):
+        """Return a borrowed channel to the pool.
+        
+        Args:
+            generation: Pool generation the channel was borrowed from
+            sftp: SFTPClient instance
+            broken: Whether the channel failed in a way that makes it unusable
+        """
+        with self._channel_available:
+            if generation == self._generation:
+                if not broken:
+                    self._idle_channels.append(sftp)
+                    self._channel_available.notify()
+                    return
+                # The slot frees up for a new channel
+                self._open_channels -= 1
+                self._channel_available.notify()
+        self._close_connection(None, sftp)
+    
+    @contextmanager
+    def _session(self):
+        """Borrow an SFTP channel from the pool for one operation.
+        
+        If an operation fails and the transport turns out to be dead, the
+        whole connection is dropped so the next call reconnects.
+        
+        Yields:
+            SFTPClient instance
+        """
+        generation, sftp = self._acquire_channel()
+        try:
+            yield sftp
+        except Exception:
+            with self._lock:
+                if generation == self._generation and not self._is_connected():
+                    self._reset_pool()
+            channel = sftp.get_channel()
+            self._release_channel(generation, sftp,
+                                  broken=channel is None or channel.closed)
+            raise
+        self._release_channel(generation, sftp)
+    
+    def close(self):
+        """Close the cached SSH connection and its idle SFTP channels."""
+        with self._lock:
+            self._reset_pool()
+    
     def _get_document_path(self, document_id: str) -> str:
         """Build the full SFTP path for a document.
         
@@ -169,7 +341,7 @@ class SFTPSourcePlugin(PDFSourcePlugin):
             Full SFTP path
         """
         # Add .pdf extension if not present
-        if not document_id.lower().endswith('.pdf'):
+        if not document_id.endswith(PDF_SUFFIXES):
             document_id = f"{document_id}.pdf"
         
         # Build path with prefix
@@ -177,49 +349,72 @@ class SFTPSourcePlugin(PDFSourcePlugin):
             return f"{self.prefix}/{document_id}"
         return f"/{document_id}" if not document_id.startswith('/') else document_id
     
-    def get_document(self, document_id: str) -> Optional[bytes]:
+    def get_document(self, document_id: str) -> Optional[Union[bytes, bytearray]]:
         """Retrieve a PDF document from the SFTP server.
         
         Args:
             document_id: The document identifier
             
         Returns:
-            PDF bytes if found, None otherwise
+            PDF content (bytes or bytearray) if found, None otherwise
+        """
+        try:
+            with self._session() as sftp:
+                return self._fetch_document(sftp, document_id)
+        except Exception as e:
+            logger.error("Error fetching %s from SFTP: %s", document_id, e)
+            return None
+    
+    def _fetch_document(self, sftp, document_id: str) -> Optional[bytearray]:
+        """Download a PDF document over an open SFTP channel.
+        
+        Args:
+            sftp: SFTPClient instance
+            document_id: The document identifier
+            
+        Returns:
+            PDF content as a bytearray if found, None otherwise
         """
         path = self._get_document_path(document_id)
-        client = None
-        sftp = None
         
         try:
-            client, sftp = self._get_connection()
+            # Read straight into a buffer allocated at the final size instead
+            # of letting a BytesIO grow and then copying it out
+            size = sftp.stat(path).st_size
+            buffer = bytearray(size)
+            view = memoryview(buffer)
+            offset = 0
             
-            # Create a BytesIO buffer to store the file
-            buffer = io.BytesIO()
-            
-            # Download the file
-            sftp.getfo(path, buffer)
+            with sftp.open(path, 'rb') as f:
+                # Pipeline the READ requests instead of one round trip per block
+                f.prefetch(size)
+                while offset < size:
+                    chunk = f.read(min(READ_CHUNK_SIZE, size - offset))
+                    if not chunk:
+                        break
+                    view[offset:offset + len(chunk)] = chunk
+                    offset += len(chunk)
             
-            content = buffer.getvalue()
-            buffer.close()
+            view.release()
+            # The file may have shrunk since stat()
+            if offset < size:
+                del buffer[offset:]
             
             # Verify it's a PDF
-            if content[:4] == b'%PDF':
-                return content
+            if buffer.startswith(b'%PDF'):
+                return buffer
             else:
-                print(f"Warning: File {document_id} may not be a valid PDF")
-                return content
+                logger.warning("File %s may not be a valid PDF", document_id)
+                return buffer
                 
         except FileNotFoundError:
-            print(f"Document not found on SFTP: {document_id}")
+            logger.warning("Document not found on SFTP: %s", document_id)
             return None
         except PermissionError:
-            print(f"Permission denied accessing {document_id} on SFTP")
+            logger.warning("Permission denied accessing %s on SFTP", document_id)
             return None
-        except Exception as e:
-            print(f"Error fetching {document_id} from SFTP: {e}")
-            return None
-        finally:
-            self._close_connection(client, sftp)
+        # Other errors (SSHException, EOFError, ...) propagate to _session(),
+        # which drops a broken channel or a dead connection from the pool
     
     def document_exists(self, document_id: str) -> bool:
         """Check if a document exists on the SFTP server.
@@ -231,23 +426,18 @@ class SFTPSourcePlugin(PDFSourcePlugin):
             True if document exists, False otherwise
         """
         path = self._get_document_path(document_id)
-        client = None
-        sftp = None
         
         try:
-            client, sftp = self._get_connection()
-            
-            # Try to stat the file
-            sftp.stat(path)
+            with self._session() as sftp:
+                # Try to stat the file
+                sftp.stat(path)
             return True
             
         except FileNotFoundError:
             return False
         except Exception as e:
-            print(f"Error checking document existence on SFTP: {e}")
+            logger.error("Error checking document existence on SFTP: %s", e)
             return False
-        finally:
-            self._close_connection(client, sftp)
     
     def list_documents(self, subdirectory: str = "", max_results: int = 100) -> List[str]:
         """List PDF documents in an SFTP directory.
@@ -268,14 +458,13 @@ class SFTPSourcePlugin(PDFSourcePlugin):
             path = self.prefix or '/'
         
         documents = []
-        client = None
-        sftp = None
         
         try:
-            client, sftp = self._get_connection()
+            with self._session() as sftp:
+                entries = sftp.listdir_attr(path)
             
             # Get list of files with attributes
-            for entry in sftp.listdir_attr(path):
+            for entry in entries:
                 if len(documents) >= max_results:
                     break
                 
@@ -284,17 +473,15 @@ class SFTPSourcePlugin(PDFSourcePlugin):
                     filename = entry.filename
                     
                     # Only include PDF files
-                    if filename.lower().endswith('.pdf'):
+                    if filename.endswith(PDF_SUFFIXES):
                         # Remove .pdf extension
                         doc_id = filename[:-4]
                         documents.append(doc_id)
             
         except FileNotFoundError:
-            print(f"Directory not found on SFTP: {path}")
+            logger.warning("Directory not found on SFTP: %s", path)
         except Exception as e:
-            print(f"Error listing SFTP documents: {e}")
-        finally:
-            self._close_connection(client, sftp)
+            logger.error("Error listing SFTP documents: %s", e)
         
         return documents
     
@@ -308,14 +495,11 @@ class SFTPSourcePlugin(PDFSourcePlugin):
             Dict with document metadata, or None if not found
         """
         path = self._get_document_path(document_id)
-        client = None
-        sftp = None
         
         try:
-            client, sftp = self._get_connection()
-            
-            # Get file attributes
-            attrs = sftp.stat(path)
+            with self._session() as sftp:
+                # Get file attributes
+                attrs = sftp.stat(path)
             
             metadata = {
                 'document_id': document_id,
@@ -334,10 +518,8 @@ class SFTPSourcePlugin(PDFSourcePlugin):
         except FileNotFoundError:
             return None
         except Exception as e:
-            print(f"Error getting SFTP document metadata: {e}")
+            logger.error("Error getting SFTP document metadata: %s", e)
             return None
-        finally:
-            self._close_connection(client, sftp)
     
     def test_connection(self) -> dict:
         """Test the SFTP connection and authentication.
@@ -417,34 +599,29 @@ class SFTPSourcePlugin(PDFSourcePlugin):
             True if upload successful, False otherwise
         """
         path = self._get_document_path(document_id)
-        client = None
-        sftp = None
         
         try:
-            client, sftp = self._get_connection()
-            
-            # Create directory if needed
-            if self.prefix:
-                try:
-                    sftp.mkdir(self.prefix)
-                except IOError:
-                    pass  # Directory probably exists
-            
-            # Upload the file
-            buffer = io.BytesIO(content)
-            sftp.putfo(buffer, path)
-            buffer.close()
+            with self._session() as sftp:
+                # Create directory if needed
+                if self.prefix:
+                    try:
+                        sftp.mkdir(self.prefix)
+                    except IOError:
+                        pass  # Directory probably exists
+                
+                # Upload the file
+                buffer = io.BytesIO(content)
+                sftp.putfo(buffer, path)
+                buffer.close()
             
             return True
             
         except PermissionError:
-            print(f"Permission denied uploading {document_id} to SFTP")
+            logger.warning("Permission denied uploading %s to SFTP", document_id)
             return False
         except Exception as e:
-            print(f"Error uploading {document_id} to SFTP: {e}")
+            logger.error("Error uploading %s to SFTP: %s", document_id, e)
             return False
-        finally:
-            self._close_connection(client, sftp)
     
     def delete_document(self, document_id: str) -> bool:
         """Delete a PDF document from the SFTP server (optional feature).
@@ -456,23 +633,18 @@ class SFTPSourcePlugin(PDFSourcePlugin):
             True if deletion successful, False otherwise
         """
         path = self._get_document_path(document_id)
-        client = None
-        sftp = None
         
         try:
-            client, sftp = self._get_connection()
-            
-            sftp.remove(path)
+            with self._session() as sftp:
+                sftp.remove(path)
             return True
             
         except FileNotFoundError:
-            print(f"Document not found on SFTP: {document_id}")
+            logger.warning("Document not found on SFTP: %s", document_id)
             return False
         except PermissionError:
-            print(f"Permission denied deleting {document_id} from SFTP")
+            logger.warning("Permission denied deleting %s from SFTP", document_id)
             return False
         except Exception as e:
-            print(f"Error deleting {document_id} from SFTP: {e}")
+            logger.error("Error deleting %s from SFTP: %s", document_id, e)
             return False
-        finally:
-            self._close_connection(client, sftp)
@@ -1,10 +1,87 @@
 """WebDAV-based PDF source plugin."""
 
-from typing import Optional, List
+import functools
+import threading
+import time
+from typing import BinaryIO, Optional, List
 from urllib.parse import urljoin, quote
 
 from app.plugins.base import PDFSourcePlugin
 
+# Size of the pieces copied when streaming a download to a file
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# PROPFIND requests are identical on every call: build them once, already
+# encoded. requests copies the header dicts, so sharing them is safe.
+PROPFIND_LIST_BODY = b'''<?xml version="1.0" encoding="utf-8"?>
+<D:propfind xmlns:D="DAV:">
+    <D:prop>
+        <D:displayname/>
+        <D:getcontenttype/>
+        <D:resourcetype/>
+    </D:prop>
+</D:propfind>'''
+
+PROPFIND_METADATA_BODY = b'''<?xml version="1.0" encoding="utf-8"?>
+<D:propfind xmlns:D="DAV:">
+    <D:prop>
+        <D:displayname/>
+        <D:getcontenttype/>
+        <D:getcontentlength/>
+        <D:getlastmodified/>
+        <D:getetag/>
+        <D:creationdate/>
+    </D:prop>
+</D:propfind>'''
+
+# Depth 1 lists only immediate children
+PROPFIND_HEADERS_DEPTH1 = {'Content-Type': 'application/xml', 'Depth': '1'}
+PROPFIND_HEADERS_DEPTH0 = {'Content-Type': 'application/xml', 'Depth': '0'}
+
+DAV_NAMESPACES = {'D': 'DAV:'}
+
+
+class _ResponseReader:
+    """Minimal file-like reader over a streamed requests response.
+    
+    Pulls the body through iter_content(), so Content-Encoding is decoded
+    and transport errors surface as requests exceptions rather than raw
+    urllib3 ones.
+    """
+    
+    def __init__(self, response):
+        self._chunks = response.iter_content(STREAM_CHUNK_SIZE)
+    
+    def read(self, size: int = -1) -> bytes:
+        # An empty chunk would read as end of stream
+        for chunk in self._chunks:
+            if chunk:
+                return chunk
+        return b''
+
+
+@functools.lru_cache(maxsize=4096)
+def _build_document_url(base_url: str, prefix: str, document_id: str) -> str:
+    """Build the full WebDAV URL for a document (memoized).
+    
+    Args:
+        base_url: Server URL, ending with '/'
+        prefix: Path prefix without trailing '/' (may be empty)
+        document_id: The document identifier
+        
+    Returns:
+        Full WebDAV URL
+    """
+    # Add .pdf extension if not present
+    if not document_id.lower().endswith('.pdf'):
+        document_id = f"{document_id}.pdf"
+    
+    # Build path with prefix
+    path = f"{prefix}/{document_id}" if prefix else document_id
+    
+    # URL encode the path (but preserve slashes)
+    return urljoin(base_url, quote(path, safe='/'))
+
 
 class WebDAVSourcePlugin(PDFSourcePlugin):
     """PDF source plugin that retrieves documents from a WebDAV server."""
@@ -21,6 +98,14 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
                 - timeout: Request timeout in seconds (default: 30)
                 - verify_ssl: Verify SSL certificates (default: True)
                 - auth_type: Authentication type: 'basic', 'digest' (default: 'basic')
+                - pool_maxsize: Keep-alive connections kept per host (default: 64)
+                - max_retries: Retries on connection errors and 502/503/504 responses
+                  (default: 3)
+                - exists_cache_ttl: Seconds a document found by document_exists
+                  is remembered, 0 to disable (default: 300)
+                - metadata_cache_ttl: Seconds the metadata of a found document
+                  is reused, 0 to disable (default: 60)
+                - cache_max_entries: Entries kept per cache (default: 10000)
         """
         super().__init__(config)
         self.base_url = config.get('base_url')
@@ -34,12 +119,25 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
         self.username = config.get('username')
         self.password = config.get('password')
         self.prefix = config.get('prefix', '')
+        self._prefix_clean = self.prefix.rstrip('/')
         self.timeout = config.get('timeout', 30)
         self.verify_ssl = config.get('verify_ssl', True)
         self.auth_type = config.get('auth_type', 'basic').lower()
+        self.pool_maxsize = config.get('pool_maxsize', 64)
+        self.max_retries = config.get('max_retries', 3)
+        self.exists_cache_ttl = config.get('exists_cache_ttl', 300)
+        self.metadata_cache_ttl = config.get('metadata_cache_ttl', 60)
+        self.cache_max_entries = config.get('cache_max_entries', 10000)
         
         # Lazy initialization
         self._session = None
+        
+        # document_id -> (expiry, answer). Only documents that were found are
+        # cached: a 404 is asked again, so a newly uploaded document shows up
+        # at once, and auth failures or server errors are never cached.
+        self._exists_cache = {}
+        self._metadata_cache = {}
+        self._cache_lock = threading.Lock()
     
     @property
     def session(self):
@@ -51,7 +149,9 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
         if self._session is None:
             try:
                 import requests
+                from requests.adapters import HTTPAdapter
                 from requests.auth import HTTPBasicAuth, HTTPDigestAuth
+                from urllib3.util.retry import Retry
             except ImportError:
                 raise ImportError(
                     "requests is required for WebDAV PDF source plugin. "
@@ -61,6 +161,24 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
             self._session = requests.Session()
             self._session.verify = self.verify_ssl
             
+            # The session lives as long as the plugin: size its keep-alive
+            # pool for concurrent workers and retry transient gateway errors.
+            # Only read methods are retried (PROPFIND isn't in urllib3's
+            # default list).
+            retry = Retry(
+                total=self.max_retries,
+                backoff_factor=0.3,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=['GET', 'HEAD', 'OPTIONS', 'PROPFIND']
+            )
+            adapter = HTTPAdapter(
+                pool_connections=32,
+                pool_maxsize=self.pool_maxsize,
+                max_retries=retry
+            )
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+            
             # Configure authentication
             if self.username and self.password:
                 if self.auth_type == 'digest':
@@ -70,6 +188,42 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
         
         return self._session
     
+    def _cache_get(self, cache: dict, document_id: str):
+        """Look up a cached answer.
+        
+        Args:
+            cache: The cache dict
+            document_id: The document identifier
+            
+        Returns:
+            Tuple of (hit, answer)
+        """
+        with self._cache_lock:
+            entry = cache.get(document_id)
+            if entry is None:
+                return False, None
+            if entry[0] <= time.monotonic():
+                del cache[document_id]
+                return False, None
+            return True, entry[1]
+    
+    def _cache_put(self, cache: dict, document_id: str, answer, ttl: int):
+        """Store an answer, evicting the oldest entry when the cache is full.
+        
+        Args:
+            cache: The cache dict
+            document_id: The document identifier
+            answer: Value to cache
+            ttl: Lifetime in seconds (0 disables caching)
+        """
+        if not ttl:
+            return
+        with self._cache_lock:
+            cache.pop(document_id, None)
+            if len(cache) >= self.cache_max_entries:
+                del cache[next(iter(cache))]
+            cache[document_id] = (time.monotonic() + ttl, answer)
+    
     def _get_document_url(self, document_id: str) -> str:
         """Build the full WebDAV URL for a document.
         
@@ -79,23 +233,7 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
         Returns:
             Full WebDAV URL
         """
-        # Add .pdf extension if not present
-        if not document_id.lower().endswith('.pdf'):
-            document_id = f"{document_id}.pdf"
-        
-        # Build path with prefix
-        if self.prefix:
-            prefix = self.prefix.rstrip('/')
-            path = f"{prefix}/{document_id}"
-        else:
-            path = document_id
-        
-        # URL encode the path (but preserve slashes)
-        path_parts = path.split('/')
-        encoded_parts = [quote(part, safe='') for part in path_parts]
-        encoded_path = '/'.join(encoded_parts)
-        
-        return urljoin(self.base_url, encoded_path)
+        return _build_document_url(self.base_url, self._prefix_clean, document_id)
     
     def get_document(self, document_id: str) -> Optional[bytes]:
         """Retrieve a PDF document from the WebDAV server.
@@ -134,17 +272,8 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
                     print(f"Warning: Content-Type '{content_type}' may not be a PDF for {document_id}")
                     return content
             
-            elif response.status_code == 404:
-                print(f"Document not found on WebDAV: {document_id}")
-                return None
-            elif response.status_code == 401:
-                print(f"Authentication failed for WebDAV: {url}")
-                return None
-            elif response.status_code == 403:
-                print(f"Access denied to WebDAV resource: {url}")
-                return None
             else:
-                print(f"WebDAV error {response.status_code} fetching document {document_id}")
+                self._report_fetch_error(response.status_code, document_id, url)
                 return None
                 
         except requests.Timeout:
@@ -157,6 +286,78 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
             print(f"Request error fetching document {document_id} from WebDAV: {e}")
             return None
     
+    def download_document(self, document_id: str, fileobj: BinaryIO) -> bool:
+        """Stream a PDF document from the WebDAV server into a file.
+        
+        The body is copied in STREAM_CHUNK_SIZE pieces, so memory use doesn't
+        grow with the document size.
+        
+        Args:
+            document_id: The document identifier
+            fileobj: Writable binary file object
+            
+        Returns:
+            True if the document was written, False otherwise
+        """
+        try:
+            import requests
+        except ImportError:
+            raise ImportError(
+                "requests is required for WebDAV PDF source plugin. "
+                "Install it with: pip install requests"
+            )
+        
+        url = self._get_document_url(document_id)
+        
+        try:
+            with self.session.get(
+                url,
+                timeout=self.timeout,
+                allow_redirects=True,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    self._report_fetch_error(response.status_code, document_id, url)
+                    return False
+                
+                content_type = response.headers.get('Content-Type', '')
+                is_first_chunk = True
+                for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                    # Verify it's a PDF
+                    if is_first_chunk:
+                        is_first_chunk = False
+                        if 'pdf' not in content_type.lower() and not chunk[:4] == b'%PDF':
+                            print(f"Warning: Content-Type '{content_type}' may not be a PDF for {document_id}")
+                    fileobj.write(chunk)
+                return True
+                
+        except requests.Timeout:
+            print(f"Timeout fetching document {document_id} from WebDAV")
+            return False
+        except requests.ConnectionError as e:
+            print(f"Connection error fetching document {document_id} from WebDAV: {e}")
+            return False
+        except requests.RequestException as e:
+            print(f"Request error fetching document {document_id} from WebDAV: {e}")
+            return False
+    
+    def _report_fetch_error(self, status_code: int, document_id: str, url: str):
+        """Print why fetching a document failed.
+        
+        Args:
+            status_code: HTTP status of the response
+            document_id: The document identifier
+            url: Document URL
+        """
+        if status_code == 404:
+            print(f"Document not found on WebDAV: {document_id}")
+        elif status_code == 401:
+            print(f"Authentication failed for WebDAV: {url}")
+        elif status_code == 403:
+            print(f"Access denied to WebDAV resource: {url}")
+        else:
+            print(f"WebDAV error {status_code} fetching document {document_id}")
+    
     def document_exists(self, document_id: str) -> bool:
         """Check if a document exists on the WebDAV server using HEAD request.
         
@@ -174,6 +375,10 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
                 "Install it with: pip install requests"
             )
         
+        hit, exists = self._cache_get(self._exists_cache, document_id)
+        if hit:
+            return exists
+        
         url = self._get_document_url(document_id)
         
         try:
@@ -182,7 +387,10 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
                 timeout=self.timeout,
                 allow_redirects=True
             )
-            return response.status_code == 200
+            exists = response.status_code == 200
+            if exists:
+                self._cache_put(self._exists_cache, document_id, True, self.exists_cache_ttl)
+            return exists
         except requests.RequestException:
             return False
     
@@ -215,41 +423,33 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
         if not list_url.endswith('/'):
             list_url += '/'
         
-        # PROPFIND request body
-        propfind_body = '''<?xml version="1.0" encoding="utf-8"?>
-<D:propfind xmlns:D="DAV:">
-    <D:prop>
-        <D:displayname/>
-        <D:getcontenttype/>
-        <D:resourcetype/>
-    </D:prop>
-</D:propfind>'''
-        
         documents = []
+        if max_results <= 0:
+            return documents
         
         try:
-            response = self.session.request(
+            with self.session.request(
                 'PROPFIND',
                 list_url,
-                data=propfind_body,
-                headers={
-                    'Content-Type': 'application/xml',
-                    'Depth': '1'  # Only immediate children
-                },
-                timeout=self.timeout
-            )
-            
-            if response.status_code in (200, 207):  # 207 Multi-Status is WebDAV success
-                # Parse XML response
-                root = ET.fromstring(response.content)
-                
-                # DAV namespace
-                namespaces = {'D': 'DAV:'}
-                
-                for response_elem in root.findall('.//D:response', namespaces):
-                    href = response_elem.find('D:href', namespaces)
-                    if href is not None:
-                        href_text = href.text
+                data=PROPFIND_LIST_BODY,
+                headers=PROPFIND_HEADERS_DEPTH1,
+                timeout=self.timeout,
+                stream=True
+            ) as response:
+                if response.status_code in (200, 207):  # 207 Multi-Status is WebDAV success
+                    # Parse the multi-status incrementally: each <D:response> is
+                    # freed once handled, and reading stops at max_results
+                    reader = _ResponseReader(response)
+                    for _, response_elem in ET.iterparse(reader, events=('end',)):
+                        if response_elem.tag != '{DAV:}response':
+                            continue
+                        
+                        href = response_elem.find('{DAV:}href')
+                        href_text = href.text if href is not None else None
+                        response_elem.clear()
+                        
+                        if not href_text:
+                            continue
                         
                         # Skip the directory itself
                         if href_text.rstrip('/') == list_url.rstrip('/'):
@@ -257,16 +457,14 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
                         
                         # Check if it's a PDF file
                         if href_text.lower().endswith('.pdf'):
-                            # Extract filename
+                            # Extract filename and remove .pdf extension
                             filename = href_text.rstrip('/').split('/')[-1]
-                            # Remove .pdf extension
-                            doc_id = filename[:-4] if filename.lower().endswith('.pdf') else filename
-                            documents.append(doc_id)
+                            documents.append(filename[:-4])
                             
                             if len(documents) >= max_results:
                                 break
-            else:
-                print(f"WebDAV PROPFIND failed with status {response.status_code}")
+                else:
+                    print(f"WebDAV PROPFIND failed with status {response.status_code}")
                 
         except requests.RequestException as e:
             print(f"Error listing WebDAV documents: {e}")
@@ -293,36 +491,25 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
                 "Install it with: pip install requests"
             )
         
-        url = self._get_document_url(document_id)
+        hit, metadata = self._cache_get(self._metadata_cache, document_id)
+        if hit:
+            # Callers may modify the dict they get back
+            return dict(metadata)
         
-        # PROPFIND request body for metadata
-        propfind_body = '''<?xml version="1.0" encoding="utf-8"?>
-<D:propfind xmlns:D="DAV:">
-    <D:prop>
-        <D:displayname/>
-        <D:getcontenttype/>
-        <D:getcontentlength/>
-        <D:getlastmodified/>
-        <D:getetag/>
-        <D:creationdate/>
-    </D:prop>
-</D:propfind>'''
+        url = self._get_document_url(document_id)
         
         try:
             response = self.session.request(
                 'PROPFIND',
                 url,
-                data=propfind_body,
-                headers={
-                    'Content-Type': 'application/xml',
-                    'Depth': '0'
-                },
+                data=PROPFIND_METADATA_BODY,
+                headers=PROPFIND_HEADERS_DEPTH0,
                 timeout=self.timeout
             )
             
             if response.status_code in (200, 207):
                 root = ET.fromstring(response.content)
-                namespaces = {'D': 'DAV:'}
+                namespaces = DAV_NAMESPACES
                 
                 props = root.find('.//D:prop', namespaces)
                 if props is not None:
@@ -356,7 +543,9 @@ class WebDAVSourcePlugin(PDFSourcePlugin):
                     if creation_date is not None and creation_date.text:
                         metadata['creation_date'] = creation_date.text
                     
-                    return metadata
+                    self._cache_put(self._metadata_cache, document_id, metadata,
+                                    self.metadata_cache_ttl)
+                    return dict(metadata)
             
             elif response.status_code == 404:
                 return None
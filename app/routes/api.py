@@ -1,28 +1,133 @@
 """API routes for OpenMark."""
 
 import os
-import uuid
 import hashlib
+import secrets
+import tempfile
 import threading
-from datetime import datetime, timedelta
-from functools import wraps
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, wraps
+from itertools import count, islice
 
 from flask import Blueprint, request, jsonify, current_app, g
 
 from app.jwt_handler import get_jwt_handler
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 api_bp = Blueprint('api', __name__)
 
 # In-memory storage for temporary documents and sessions
 temp_documents = {}
 download_status = {}  # Track download status: 'pending', 'downloading', 'ready', 'error'
+TEMP_DOCUMENTS_MAX_ENTRIES = 10000
 active_tokens = {}
-user_statistics = {}
-user_history = {}
+user_statistics = defaultdict(lambda: {
+    'documents_viewed': 0,
+    'notes_created': 0,
+    'highlights_created': 0
+})  # username -> counters, created on first update
+user_history = {}  # username -> deque of views, most recent first
+HISTORY_MAX_ENTRIES = 1000
+
+# Serializes inserts and evictions in temp_documents/download_status
+_temp_documents_lock = threading.Lock()
+
+# Guard the read-modify-write updates of user_statistics and user_history,
+# which Flask's threaded workers would otherwise race on. Every update only
+# touches one user's entries, so users are spread over a few striped locks
+# instead of serializing all writers on one.
+USER_LOCK_STRIPES = 16
+_user_locks = [threading.Lock() for _ in range(USER_LOCK_STRIPES)]
+
+# Downloads into the cache in progress: document_id -> Future of the result.
+# Concurrent requests for one document wait on the first download.
+_inflight_downloads = {}
+_inflight_lock = threading.Lock()
+
+# Recently validated auth tokens: token -> (user, monotonic expiry).
+# Spares the auth plugin (and its revocation lookup) a call per request;
+# a token revoked on another worker stays accepted here for at most the TTL.
+validated_tokens = {}
+VALIDATED_TOKEN_TTL = 60
+VALIDATED_TOKEN_MAX_ENTRIES = 100000
+
+# Recently validated DATs: dat -> (dat_info, monotonic expiry). DATs are
+# never revoked, so only their own expiry bounds how long they are reused.
+validated_dats = {}
+VALIDATED_DAT_TTL = 3600
+
+_validated_tokens_lock = threading.RLock()
+
+# Last formatted timestamp as a (second, string) pair, see _now_iso()
+_now_iso_cache = [(None, '')]
 
+# Temporary document IDs: a random per-process prefix (telling workers
+# apart) followed by a per-process sequence number
+_temp_id_prefix = secrets.token_hex(8)
+_temp_id_counter = count()
+
+
+def _user_lock(username):
+    """Lock guarding a user's statistics and history entries."""
+    return _user_locks[hash(username) % USER_LOCK_STRIPES]
+
+
+def json_response(obj, status=200):
+    """Build a JSON response, serialized with orjson when it is installed.
+    
+    Args:
+        obj: JSON-serializable payload
+        status: HTTP status code
+        
+    Returns:
+        Flask response
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            body = orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Types only Flask's provider knows how to encode
+            pass
+        else:
+            return current_app.response_class(body, status=status, mimetype='application/json')
+    
+    response = jsonify(obj)
+    response.status_code = status
+    return response
 
+
+def _now_iso():
+    """Current UTC time as an ISO 8601 string, to the second.
+    
+    The string is only formatted once per second; bursts of requests
+    reuse it.
+    
+    Returns:
+        Timestamp such as '2026-01-13T10:00:00Z'
+    """
+    now = int(time.time())
+    second, formatted = _now_iso_cache[0]
+    if second != now:
+        formatted = datetime.fromtimestamp(now, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        # Swap the pair in one assignment so readers never see a mixed state
+        _now_iso_cache[0] = (now, formatted)
+    return formatted
+
+
+@lru_cache(maxsize=32)
 def format_duration(seconds):
-    """Format duration in seconds to human-readable string."""
+    """Format duration in seconds to human-readable string.
+    
+    Only a few distinct DAT durations occur, so results are memoized.
+    """
     hours = seconds // 3600
     if hours >= 1:
         return f"{hours} hour{'s' if hours > 1 else ''}"
@@ -30,6 +135,106 @@ def format_duration(seconds):
     return f"{minutes} minute{'s' if minutes > 1 else ''}"
 
 
+def _get_validated(cache, token):
+    """Look up a token in a validation cache.
+    
+    Args:
+        cache: validated_tokens or validated_dats
+        token: The raw token
+        
+    Returns:
+        Cached validation result, or None on a miss
+    """
+    with _validated_tokens_lock:
+        cached = cache.get(token)
+        if cached is None:
+            return None
+        if cached[1] > time.monotonic():
+            return cached[0]
+        del cache[token]
+        return None
+
+
+def _put_validated(cache, token, value, ttl):
+    """Store a validation result for up to ttl seconds.
+    
+    Args:
+        cache: validated_tokens or validated_dats
+        token: The raw token
+        value: Validation result
+        ttl: Seconds the result may be reused
+    """
+    if ttl <= 0:
+        return
+    with _validated_tokens_lock:
+        if len(cache) >= VALIDATED_TOKEN_MAX_ENTRIES:
+            # Evict the oldest entry (dicts keep insertion order)
+            cache.pop(next(iter(cache)))
+        cache[token] = (value, time.monotonic() + ttl)
+
+
+def validate_token_cached(auth_plugin, token):
+    """Validate an auth token, reusing recent successful validations.
+    
+    Args:
+        auth_plugin: Authentication plugin
+        token: The authentication token
+        
+    Returns:
+        User dict if the token is valid, None otherwise
+    """
+    user = _get_validated(validated_tokens, token)
+    if user is not None:
+        return user
+    
+    user = auth_plugin.validate_token(token)
+    if not user:
+        return None
+    
+    # Never keep a token cached past its own expiry
+    ttl = VALIDATED_TOKEN_TTL
+    jwt_handler = get_jwt_handler()
+    expiry = jwt_handler.get_token_expiry(token) if jwt_handler else None
+    if expiry is not None:
+        ttl = min(ttl, (expiry - datetime.utcnow()).total_seconds())
+    
+    _put_validated(validated_tokens, token, user, ttl)
+    return user
+
+
+def validate_dat_cached(jwt_handler, dat):
+    """Validate a Document Access Token, reusing recent validations.
+    
+    Args:
+        jwt_handler: JWT handler
+        dat: The Document Access Token
+        
+    Returns:
+        DAT info dict if the token is valid, None otherwise
+    """
+    dat_info = _get_validated(validated_dats, dat)
+    if dat_info is not None:
+        return dat_info
+    
+    dat_info = jwt_handler.validate_document_token(dat)
+    if not dat_info:
+        return None
+    
+    ttl = min(VALIDATED_DAT_TTL, (dat_info['expires_at'] - datetime.utcnow()).total_seconds())
+    _put_validated(validated_dats, dat, dat_info, ttl)
+    return dat_info
+
+
+def forget_validated_token(token):
+    """Drop a token from the validation cache (e.g. on logout).
+    
+    Args:
+        token: The authentication token
+    """
+    with _validated_tokens_lock:
+        validated_tokens.pop(token, None)
+
+
 def require_auth(f):
     """Decorator to require authentication for API endpoints.
     
@@ -40,13 +245,13 @@ def require_auth(f):
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        jwt_handler = get_jwt_handler()
-        plugin_manager = current_app.config['PLUGIN_MANAGER']
+        query = request.args
         
         # Try DAT (Document Access Token) first
-        dat = request.args.get('dat')
-        if dat and jwt_handler:
-            dat_info = jwt_handler.validate_document_token(dat)
+        dat = query.get('dat')
+        if dat:
+            jwt_handler = get_jwt_handler()
+            dat_info = validate_dat_cached(jwt_handler, dat) if jwt_handler else None
             if dat_info:
                 g.user = {'username': dat_info['username'], 'role': 'user'}
                 g.token = None
@@ -62,16 +267,17 @@ def require_auth(f):
         
         # Check query parameter as fallback
         if not token:
-            token = request.args.get('token')
+            token = query.get('token')
         
         if not token:
-            return jsonify({'success': False, 'error': 'Missing authentication token'}), 401
+            return json_response({'success': False, 'error': 'Missing authentication token'}, 401)
         
         # Validate token
-        user = plugin_manager.auth_plugin.validate_token(token)
+        plugin_manager = current_app.config['PLUGIN_MANAGER']
+        user = validate_token_cached(plugin_manager.auth_plugin, token)
         
         if not user:
-            return jsonify({'success': False, 'error': 'Invalid or expired token'}), 401
+            return json_response({'success': False, 'error': 'Invalid or expired token'}, 401)
         
         g.user = user
         g.token = token
@@ -82,6 +288,161 @@ def require_auth(f):
     return decorated_function
 
 
+def new_temp_document_id():
+    """Generate a temporary document ID.
+    
+    The ID is only a lookup key: every route serving it also checks the
+    caller's token or DAT and the owning user, so it does not need to be
+    unpredictable and is not drawn from the OS entropy pool per request.
+    
+    Returns:
+        Temporary document ID
+    """
+    return f"temp_{_temp_id_prefix}{next(_temp_id_counter):x}"
+
+
+def register_temp_document(temp_doc_id, doc_info):
+    """Store a temporary document mapping with a 'pending' download status.
+    
+    The cache cleaner drops expired entries once per cache period; past
+    TEMP_DOCUMENTS_MAX_ENTRIES the oldest entries are evicted here so memory
+    stays bounded between runs, or when the cleaner is not running.
+    
+    Args:
+        temp_doc_id: Temporary document ID
+        doc_info: Mapping stored for the temporary document
+    """
+    with _temp_documents_lock:
+        while len(temp_documents) >= TEMP_DOCUMENTS_MAX_ENTRIES:
+            # Dicts keep insertion order: the first key is the oldest entry
+            oldest = next(iter(temp_documents))
+            temp_documents.pop(oldest, None)
+            download_status.pop(oldest, None)
+        
+        temp_documents[temp_doc_id] = doc_info
+        download_status[temp_doc_id] = 'pending'
+
+
+def get_cache_filename(document_id):
+    """Name of the cache file shared by every request for a document.
+    
+    Args:
+        document_id: The document identifier
+        
+    Returns:
+        File name, relative to the cache directory
+    """
+    digest = hashlib.blake2b(document_id.encode('utf-8'), digest_size=16).hexdigest()
+    return f"doc_{digest}.pdf"
+
+
+def is_cache_fresh(cache_path, cache_duration):
+    """Check whether a cached file exists and is younger than the cache duration.
+    
+    Args:
+        cache_path: Path of the cached PDF
+        cache_duration: Cache duration in seconds
+        
+    Returns:
+        True if the cached file can be served as is
+    """
+    try:
+        return time.time() - os.path.getmtime(cache_path) < cache_duration
+    except OSError:
+        return False
+
+
+def write_document_to_cache(pdf_plugin, document_id, cache_path):
+    """Download a document into the cache directory.
+    
+    The document is streamed straight to disk rather than through memory.
+    The viewer serves the cache file as soon as it exists, so it is written
+    to a side file and renamed once complete. The side file comes from
+    mkstemp, so concurrent requests in any worker process never share one.
+    
+    Args:
+        pdf_plugin: PDF source plugin
+        document_id: The document identifier
+        cache_path: Destination path of the cached PDF
+        
+    Returns:
+        True if the document was found and cached
+    """
+    fd, part_path = tempfile.mkstemp(
+        dir=os.path.dirname(cache_path),
+        prefix=f"{os.path.basename(cache_path)}.",
+        suffix='.part'
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            found = pdf_plugin.download_document(document_id, f)
+        if found:
+            os.chmod(part_path, 0o644)
+            os.replace(part_path, cache_path)
+        return found
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+def cache_document_once(pdf_plugin, document_id, cache_path):
+    """Download a document into the cache, joining a download in progress.
+    
+    Args:
+        pdf_plugin: PDF source plugin
+        document_id: The document identifier
+        cache_path: Destination path of the cached PDF
+        
+    Returns:
+        True if the document was found and cached
+    """
+    with _inflight_lock:
+        future = _inflight_downloads.get(document_id)
+        owner = future is None
+        if owner:
+            future = Future()
+            _inflight_downloads[document_id] = future
+    
+    if not owner:
+        return future.result()
+    
+    try:
+        found = write_document_to_cache(pdf_plugin, document_id, cache_path)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(found)
+        return found
+    finally:
+        with _inflight_lock:
+            _inflight_downloads.pop(document_id, None)
+
+
+def download_to_cache(pdf_plugin, document_id, temp_doc_id, cache_path):
+    """Download a document into the cache, tracking it in download_status.
+    
+    Runs on the cache pool for quickView and requestDocument.
+    
+    Args:
+        pdf_plugin: PDF source plugin
+        document_id: The document identifier
+        temp_doc_id: Temporary document ID whose status is updated
+        cache_path: Destination path of the cached PDF
+    """
+    try:
+        download_status[temp_doc_id] = 'downloading'
+        found = cache_document_once(pdf_plugin, document_id, cache_path)
+        
+        if found:
+            download_status[temp_doc_id] = 'ready'
+        else:
+            download_status[temp_doc_id] = 'error'
+    except Exception as e:
+        print(f"Error downloading PDF {document_id}: {e}")
+        download_status[temp_doc_id] = 'error'
+
+
 def get_client_ip():
     """Get the client IP address."""
     if request.headers.get('X-Forwarded-For'):
@@ -95,25 +456,25 @@ def authenticate():
     data = request.get_json()
     
     if not data:
-        return jsonify({'success': False, 'error': 'Missing request body'}), 400
+        return json_response({'success': False, 'error': 'Missing request body'}, 400)
     
     username = data.get('username')
     password = data.get('password')
     
     if not username or not password:
-        return jsonify({'success': False, 'error': 'Missing username or password'}), 400
+        return json_response({'success': False, 'error': 'Missing username or password'}, 400)
     
     plugin_manager = current_app.config['PLUGIN_MANAGER']
     result = plugin_manager.auth_plugin.authenticate(username, password)
     
     if result:
-        return jsonify({
+        return json_response({
             'success': True,
             'token': result['token'],
             'expires_at': result['expires_at']
         })
     
-    return jsonify({'success': False, 'error': 'Invalid credentials'}), 401
+    return json_response({'success': False, 'error': 'Invalid credentials'}, 401)
 
 
 @api_bp.route('/quickView', methods=['POST'])
@@ -133,7 +494,7 @@ def quick_view():
     data = request.get_json()
     
     if not data:
-        return jsonify({'success': False, 'error': 'Missing request body'}), 400
+        return json_response({'success': False, 'error': 'Missing request body'}, 400)
     
     username = data.get('username')
     password = data.get('password')
@@ -145,28 +506,34 @@ def quick_view():
     hide_logo = data.get('hideLogo', False)
     
     if not username or not password:
-        return jsonify({'success': False, 'error': 'Missing username or password'}), 400
+        return json_response({'success': False, 'error': 'Missing username or password'}, 400)
     
     if not document_id:
-        return jsonify({'success': False, 'error': 'Missing documentId'}), 400
+        return json_response({'success': False, 'error': 'Missing documentId'}, 400)
     
-    plugin_manager = current_app.config['PLUGIN_MANAGER']
-    config = current_app.config['CONFIG']
-    jwt_handler = current_app.config['JWT_HANDLER']
+    app_config = current_app.config
+    plugin_manager = app_config['PLUGIN_MANAGER']
+    config = app_config['CONFIG']
+    jwt_handler = app_config['JWT_HANDLER']
     
     # Step 1: Authenticate
     auth_result = plugin_manager.auth_plugin.authenticate(username, password)
     
     if not auth_result:
-        return jsonify({'success': False, 'error': 'Invalid credentials'}), 401
+        return json_response({'success': False, 'error': 'Invalid credentials'}, 401)
     
-    # Step 2: Check if document exists
-    if not plugin_manager.pdf_plugin.document_exists(document_id):
-        return jsonify({'success': False, 'error': 'Document not found'}), 404
-    
-    # Step 3: Generate temporary document ID and cache settings
-    temp_doc_id = f"temp_{uuid.uuid4().hex}"
+    # Requests for the same document share one cache file
     cache_duration = config.cache.get('duration_seconds', 3600)
+    cache_filename = get_cache_filename(document_id)
+    cache_path = os.path.join(app_config['CACHE_DIR'], cache_filename)
+    cache_fresh = is_cache_fresh(cache_path, cache_duration)
+    
+    # Step 2: Check if document exists (a fresh cached copy proves it does)
+    if not cache_fresh and not plugin_manager.pdf_plugin.document_exists(document_id):
+        return json_response({'success': False, 'error': 'Document not found'}, 404)
+    
+    # Step 3: Generate temporary document ID
+    temp_doc_id = new_temp_document_id()
     
     # DAT (Document Access Token) validity: longer than cache to allow viewing
     # Default: 2 hours or cache duration * 4, whichever is longer
@@ -175,42 +542,23 @@ def quick_view():
     cache_expires_at = datetime.utcnow() + timedelta(seconds=cache_duration)
     
     # Store temporary document mapping
-    temp_documents[temp_doc_id] = {
+    register_temp_document(temp_doc_id, {
         'document_id': document_id,
         'user': username,
         'expires_at': dat_expires_at.isoformat() + 'Z',  # Use DAT expiry for cache
-        'created_at': datetime.utcnow().isoformat() + 'Z'
-    }
-    
-    # Initialize download status
-    download_status[temp_doc_id] = 'pending'
-    
-    # Cache the document in background thread
-    cache_dir_config = config.cache.get('directory', './cache')
-    app_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    cache_dir = os.path.join(app_root, cache_dir_config.lstrip('./'))
-    os.makedirs(cache_dir, exist_ok=True)
-    cache_path = os.path.join(cache_dir, f"{temp_doc_id}.pdf")
+        'created_at': _now_iso(),
+        'cache_file': cache_filename,
+        'expires_ts': time.time() + dat_duration  # Checked by the viewer and the cache cleaner
+    })
     
     # Start background download
-    def download_pdf():
-        try:
-            download_status[temp_doc_id] = 'downloading'
-            pdf_data = plugin_manager.pdf_plugin.get_document(document_id)
-            
-            if pdf_data:
-                with open(cache_path, 'wb') as f:
-                    f.write(pdf_data)
-                download_status[temp_doc_id] = 'ready'
-            else:
-                download_status[temp_doc_id] = 'error'
-        except Exception as e:
-            print(f"Error downloading PDF {document_id}: {e}")
-            download_status[temp_doc_id] = 'error'
-    
-    thread = threading.Thread(target=download_pdf)
-    thread.daemon = True
-    thread.start()
+    if cache_fresh:
+        # Another request already cached this document: reuse the file
+        download_status[temp_doc_id] = 'ready'
+    else:
+        current_app.extensions['cache_pool'].submit(
+            download_to_cache, plugin_manager.pdf_plugin, document_id, temp_doc_id, cache_path
+        )
     
     # Step 4: Generate Document Access Token (DAT)
     dat = jwt_handler.generate_document_token(
@@ -229,7 +577,7 @@ def quick_view():
     # Calculate human-readable validity
     valid_for = format_duration(dat_duration)
     
-    return jsonify({
+    return json_response({
         'success': True,
         'viewUrl': view_path,
         'dat': dat,
@@ -243,9 +591,10 @@ def quick_view():
 def logout():
     """Logout and invalidate the current token."""
     plugin_manager = current_app.config['PLUGIN_MANAGER']
+    forget_validated_token(g.token)
     plugin_manager.auth_plugin.invalidate_token(g.token)
     
-    return jsonify({'success': True})
+    return json_response({'success': True})
 
 
 @api_bp.route('/requestDocument', methods=['POST'])
@@ -259,7 +608,7 @@ def request_document():
     data = request.get_json()
     
     if not data:
-        return jsonify({'success': False, 'error': 'Missing request body'}), 400
+        return json_response({'success': False, 'error': 'Missing request body'}, 400)
     
     document_id = data.get('documentId')
     
@@ -269,61 +618,48 @@ def request_document():
     hide_logo = data.get('hideLogo', False)
     
     if not document_id:
-        return jsonify({'success': False, 'error': 'Missing documentId'}), 400
+        return json_response({'success': False, 'error': 'Missing documentId'}, 400)
     
-    plugin_manager = current_app.config['PLUGIN_MANAGER']
-    config = current_app.config['CONFIG']
-    jwt_handler = current_app.config['JWT_HANDLER']
+    app_config = current_app.config
+    plugin_manager = app_config['PLUGIN_MANAGER']
+    config = app_config['CONFIG']
+    jwt_handler = app_config['JWT_HANDLER']
     
-    # Check if document exists
-    if not plugin_manager.pdf_plugin.document_exists(document_id):
-        return jsonify({'success': False, 'error': 'Document not found'}), 404
+    # Requests for the same document share one cache file
+    cache_duration = config.cache.get('duration_seconds', 3600)
+    cache_filename = get_cache_filename(document_id)
+    cache_path = os.path.join(app_config['CACHE_DIR'], cache_filename)
+    cache_fresh = is_cache_fresh(cache_path, cache_duration)
+    
+    # Check if document exists (a fresh cached copy proves it does)
+    if not cache_fresh and not plugin_manager.pdf_plugin.document_exists(document_id):
+        return json_response({'success': False, 'error': 'Document not found'}, 404)
     
     # Generate temporary document ID
-    temp_doc_id = f"temp_{uuid.uuid4().hex}"
-    cache_duration = config.cache.get('duration_seconds', 3600)
+    temp_doc_id = new_temp_document_id()
     
     # DAT validity: longer than cache to allow viewing
     dat_duration = max(7200, cache_duration * 4)
     dat_expires_at = datetime.utcnow() + timedelta(seconds=dat_duration)
     
     # Store temporary document mapping
-    temp_documents[temp_doc_id] = {
+    register_temp_document(temp_doc_id, {
         'document_id': document_id,
         'user': g.user['username'],
         'expires_at': dat_expires_at.isoformat() + 'Z',
-        'created_at': datetime.utcnow().isoformat() + 'Z'
-    }
-    
-    # Initialize download status
-    download_status[temp_doc_id] = 'pending'
-    
-    # Cache the document in background thread
-    cache_dir_config = config.cache.get('directory', './cache')
-    app_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    cache_dir = os.path.join(app_root, cache_dir_config.lstrip('./'))
-    os.makedirs(cache_dir, exist_ok=True)
-    cache_path = os.path.join(cache_dir, f"{temp_doc_id}.pdf")
+        'created_at': _now_iso(),
+        'cache_file': cache_filename,
+        'expires_ts': time.time() + dat_duration  # Checked by the viewer and the cache cleaner
+    })
     
     # Start background download
-    def download_pdf():
-        try:
-            download_status[temp_doc_id] = 'downloading'
-            pdf_data = plugin_manager.pdf_plugin.get_document(document_id)
-            
-            if pdf_data:
-                with open(cache_path, 'wb') as f:
-                    f.write(pdf_data)
-                download_status[temp_doc_id] = 'ready'
-            else:
-                download_status[temp_doc_id] = 'error'
-        except Exception as e:
-            print(f"Error downloading PDF {document_id}: {e}")
-            download_status[temp_doc_id] = 'error'
-    
-    thread = threading.Thread(target=download_pdf)
-    thread.daemon = True
-    thread.start()
+    if cache_fresh:
+        # Another request already cached this document: reuse the file
+        download_status[temp_doc_id] = 'ready'
+    else:
+        current_app.extensions['cache_pool'].submit(
+            download_to_cache, plugin_manager.pdf_plugin, document_id, temp_doc_id, cache_path
+        )
     
     # Generate Document Access Token (DAT)
     dat = jwt_handler.generate_document_token(
@@ -336,7 +672,7 @@ def request_document():
         hide_logo=hide_logo
     )
     
-    return jsonify({
+    return json_response({
         'success': True,
         'dat': dat,
         'viewUrl': f'/api/viewDocument?dat={dat}',
@@ -355,8 +691,9 @@ def get_document_status(temp_doc_id):
     
     Returns status: 'pending', 'downloading', 'ready', 'error', or 'not_found'
     """
-    jwt_handler = current_app.config['JWT_HANDLER']
-    plugin_manager = current_app.config['PLUGIN_MANAGER']
+    app_config = current_app.config
+    jwt_handler = app_config['JWT_HANDLER']
+    plugin_manager = app_config['PLUGIN_MANAGER']
     
     # Check for DAT first
     dat = request.args.get('dat')
@@ -364,7 +701,7 @@ def get_document_status(temp_doc_id):
     
     if dat:
         # Validate DAT
-        dat_info = jwt_handler.validate_document_token(dat)
+        dat_info = validate_dat_cached(jwt_handler, dat)
         if dat_info and dat_info['temp_document_id'] == temp_doc_id:
             username = dat_info['username']
     
@@ -376,37 +713,36 @@ def get_document_status(temp_doc_id):
             token = auth_header.split(' ')[1]
         
         if token:
-            user = plugin_manager.auth_plugin.validate_token(token)
+            user = validate_token_cached(plugin_manager.auth_plugin, token)
             if user:
                 username = user['username']
     
     if not username:
-        return jsonify({
+        return json_response({
             'success': False,
             'status': 'unauthorized',
             'error': 'Invalid or missing authentication'
-        }), 401
+        }, 401)
     
-    if temp_doc_id not in temp_documents:
-        return jsonify({
+    doc_info = temp_documents.get(temp_doc_id)
+    if doc_info is None:
+        return json_response({
             'success': False,
             'status': 'not_found',
             'error': 'Document not found'
-        }), 404
-    
-    doc_info = temp_documents[temp_doc_id]
+        }, 404)
     
     # Check if user matches
     if doc_info['user'] != username:
-        return jsonify({
+        return json_response({
             'success': False,
             'status': 'forbidden',
             'error': 'Access denied'
-        }), 403
+        }, 403)
     
     status = download_status.get(temp_doc_id, 'pending')
     
-    return jsonify({
+    return json_response({
         'success': True,
         'status': status,
         'documentId': doc_info['document_id']
@@ -420,16 +756,16 @@ def save_annotations():
     data = request.get_json()
     
     if not data:
-        return jsonify({'success': False, 'error': 'Missing request body'}), 400
+        return json_response({'success': False, 'error': 'Missing request body'}, 400)
     
     document_id = data.get('documentId')
     annotations = data.get('annotations')
     
     if not document_id:
-        return jsonify({'success': False, 'error': 'Missing documentId'}), 400
+        return json_response({'success': False, 'error': 'Missing documentId'}, 400)
     
     if annotations is None:
-        return jsonify({'success': False, 'error': 'Missing annotations'}), 400
+        return json_response({'success': False, 'error': 'Missing annotations'}, 400)
     
     plugin_manager = current_app.config['PLUGIN_MANAGER']
     success = plugin_manager.annotations_plugin.save_annotations(
@@ -439,24 +775,21 @@ def save_annotations():
     )
     
     if success:
-        # Update statistics
+        # Update statistics (counted before taking the lock)
         username = g.user['username']
-        if username not in user_statistics:
-            user_statistics[username] = {
-                'documents_viewed': 0,
-                'notes_created': 0,
-                'highlights_created': 0
-            }
+        notes_created = len(annotations.get('notes', []))
+        highlights_created = len(annotations.get('highlights', []))
+        with _user_lock(username):
+            stats = user_statistics[username]
+            stats['notes_created'] = notes_created
+            stats['highlights_created'] = highlights_created
         
-        user_statistics[username]['notes_created'] = len(annotations.get('notes', []))
-        user_statistics[username]['highlights_created'] = len(annotations.get('highlights', []))
-        
-        return jsonify({
+        return json_response({
             'success': True,
             'message': 'Annotations saved successfully'
         })
     
-    return jsonify({'success': False, 'error': 'Failed to save annotations'}), 500
+    return json_response({'success': False, 'error': 'Failed to save annotations'}, 500)
 
 
 @api_bp.route('/getAnnotations', methods=['GET'])
@@ -466,7 +799,7 @@ def get_annotations():
     document_id = request.args.get('documentId')
     
     if not document_id:
-        return jsonify({'success': False, 'error': 'Missing documentId'}), 400
+        return json_response({'success': False, 'error': 'Missing documentId'}, 400)
     
     plugin_manager = current_app.config['PLUGIN_MANAGER']
     annotations = plugin_manager.annotations_plugin.get_annotations(
@@ -474,10 +807,15 @@ def get_annotations():
         document_id
     )
     
-    return jsonify({
+    response = json_response({
         'success': True,
         'annotations': annotations
     })
+    
+    # Let polling clients revalidate: unchanged annotations answer 304
+    response.add_etag()
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
 
 
 @api_bp.route('/statistics', methods=['GET'])
@@ -486,15 +824,16 @@ def get_statistics():
     """Get usage statistics for the current user."""
     username = g.user['username']
     
-    stats = user_statistics.get(username, {
+    # Copy so the response field isn't written into the shared entry
+    stats = dict(user_statistics.get(username, {
         'documents_viewed': 0,
         'notes_created': 0,
         'highlights_created': 0
-    })
+    }))
     
-    stats['last_activity'] = datetime.utcnow().isoformat() + 'Z'
+    stats['last_activity'] = _now_iso()
     
-    return jsonify({
+    return json_response({
         'success': True,
         'statistics': stats
     })
@@ -508,13 +847,16 @@ def get_history():
     limit = request.args.get('limit', 50, type=int)
     offset = request.args.get('offset', 0, type=int)
     
-    history = user_history.get(username, [])
-    total = len(history)
+    start = max(offset, 0)
     
-    # Apply pagination
-    paginated_history = history[offset:offset + limit]
+    # Apply pagination (islice doesn't copy the entries before the page).
+    # Iterating a deque that is appended to concurrently raises, hence the lock.
+    with _user_lock(username):
+        history = user_history.get(username, ())
+        total = len(history)
+        paginated_history = list(islice(history, start, start + max(limit, 0)))
     
-    return jsonify({
+    return json_response({
         'success': True,
         'history': paginated_history,
         'total': total,
@@ -525,25 +867,20 @@ def get_history():
 
 def record_document_view(username: str, document_id: str, document_name: str = None):
     """Record a document view in history."""
-    if username not in user_history:
-        user_history[username] = []
-    
-    user_history[username].insert(0, {
+    entry = {
         'document_id': document_id,
         'document_name': document_name or document_id,
-        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'timestamp': _now_iso(),
         'ip_address': get_client_ip(),
         'duration_seconds': 0
-    })
+    }
     
-    # Update statistics
-    if username not in user_statistics:
-        user_statistics[username] = {
-            'documents_viewed': 0,
-            'notes_created': 0,
-            'highlights_created': 0
-        }
-    user_statistics[username]['documents_viewed'] += 1
-    
-    # Keep only last 1000 entries
-    user_history[username] = user_history[username][:1000]
+    with _user_lock(username):
+        # Bounded deque: O(1) insert, and only the last entries are kept
+        if username not in user_history:
+            user_history[username] = deque(maxlen=HISTORY_MAX_ENTRIES)
+        
+        user_history[username].appendleft(entry)
+        
+        # Update statistics
+        user_statistics[username]['documents_viewed'] += 1
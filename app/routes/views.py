@@ -1,30 +1,77 @@
 """View routes for OpenMark."""
 
 import os
-from datetime import datetime
+import time
 
 from flask import Blueprint, request, render_template, redirect, url_for, current_app, send_file, abort, make_response
 
-from app.routes.api import temp_documents, require_auth, record_document_view
+from app.routes.api import temp_documents, require_auth, record_document_view, validate_token_cached, validate_dat_cached
 from app.jwt_handler import get_jwt_handler
 
 views_bp = Blueprint('views', __name__)
 
+# Headers for pages embedded in iframes, identical on every response
+IFRAME_HEADERS = (
+    # frame-ancestors * allows the page to be embedded in any iframe
+    ('Content-Security-Policy', 'frame-ancestors *'),
+    # Allow cross-origin isolation for SharedArrayBuffer if needed
+    ('Cross-Origin-Embedder-Policy', 'credentialless'),
+    ('Cross-Origin-Opener-Policy', 'same-origin-allow-popups'),
+)
+
+# CORS headers for cross-domain PDF access
+PDF_CORS_HEADERS = (
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type, Authorization, Range'),
+    # Cross-origin PDF.js only switches to range requests if it can read these
+    ('Access-Control-Expose-Headers', 'Accept-Ranges, Content-Range, Content-Length'),
+)
+
 
 def add_iframe_headers(response):
     """Add headers to allow embedding in iframe from any origin."""
     # Remove X-Frame-Options to allow iframe embedding
     response.headers.pop('X-Frame-Options', None)
+    response.headers.update(IFRAME_HEADERS)
+    return response
+
+
+def render_error(error: str, status: int):
+    """Render the error page, reusing the page already rendered for this message.
     
-    # Set Content-Security-Policy to allow embedding from any origin
-    # frame-ancestors * allows the page to be embedded in any iframe
-    response.headers['Content-Security-Policy'] = "frame-ancestors *"
+    Error messages are fixed strings, so the cache stays small.
     
-    # Allow cross-origin isolation for SharedArrayBuffer if needed
-    response.headers['Cross-Origin-Embedder-Policy'] = 'credentialless'
-    response.headers['Cross-Origin-Opener-Policy'] = 'same-origin-allow-popups'
+    Args:
+        error: Error message shown on the page
+        status: HTTP status code
+        
+    Returns:
+        Tuple of (HTML page, status code)
+    """
+    error_pages = current_app.extensions.setdefault('error_pages', {})
+    # The stylesheet URL depends on the script root the app is mounted under
+    key = (request.script_root, error)
+    page = error_pages.get(key)
+    if page is None:
+        page = error_pages[key] = render_template('error.html', error=error)
+    return page, status
+
+
+def query_flag(name: str) -> bool:
+    """Read a boolean query parameter ('true', case-insensitive).
     
-    return response
+    Args:
+        name: Query parameter name
+        
+    Returns:
+        True if the parameter is set to 'true', False otherwise
+    """
+    value = request.args.get(name)
+    if value is None:
+        return False
+    # Exact match first: only unusual casings pay for lower()
+    return value == 'true' or value.lower() == 'true'
 
 
 @views_bp.route('/')
@@ -64,20 +111,20 @@ def view_document():
     - Has longer validity (2 hours by default)
     - Doesn't require auth token validation on each request
     """
-    jwt_handler = current_app.config['JWT_HANDLER']
-    plugin_manager = current_app.config['PLUGIN_MANAGER']
-    config = current_app.config['CONFIG']
+    app_config = current_app.config
+    jwt_handler = app_config['JWT_HANDLER']
+    plugin_manager = app_config['PLUGIN_MANAGER']
+    config = app_config['CONFIG']
     
     # Try DAT (Document Access Token) first - preferred method
     dat = request.args.get('dat')
     
     if dat:
         # Validate DAT
-        dat_info = jwt_handler.validate_document_token(dat)
+        dat_info = validate_dat_cached(jwt_handler, dat)
         
         if not dat_info:
-            return render_template('error.html', 
-                                   error='Invalid or expired document access token'), 401
+            return render_error('Invalid or expired document access token', 401)
         
         temp_doc_id = dat_info['temp_document_id']
         username = dat_info['username']
@@ -88,8 +135,7 @@ def view_document():
         
         # Check if temp document still exists in cache
         if temp_doc_id not in temp_documents:
-            return render_template('error.html', 
-                                   error='Document cache expired. Please request a new access token.'), 410
+            return render_error('Document cache expired. Please request a new access token.', 410)
         
         # Record document view
         record_document_view(username, document_id)
@@ -112,43 +158,36 @@ def view_document():
     # Fallback: tempDocumentId + token authentication
     temp_doc_id = request.args.get('tempDocumentId')
     token = request.args.get('token')
-    hide_annotations_tools = request.args.get('hideAnnotationsTools', 'false').lower() == 'true'
-    hide_annotations = request.args.get('hideAnnotations', 'false').lower() == 'true'
-    hide_logo = request.args.get('hideLogo', 'false').lower() == 'true'
+    hide_annotations_tools = query_flag('hideAnnotationsTools')
+    hide_annotations = query_flag('hideAnnotations')
+    hide_logo = query_flag('hideLogo')
     
     # If hideAnnotations is true, also hide the tools
     if hide_annotations:
         hide_annotations_tools = True
     
     if not temp_doc_id or not token:
-        return render_template('error.html', 
-                               error='Missing document access token (dat) parameter'), 400
+        return render_error('Missing document access token (dat) parameter', 400)
     
     # Validate token
-    user = plugin_manager.auth_plugin.validate_token(token)
+    user = validate_token_cached(plugin_manager.auth_plugin, token)
     
     if not user:
-        return render_template('error.html', 
-                               error='Invalid or expired token'), 401
+        return render_error('Invalid or expired token', 401)
     
     # Check if temp document exists and is valid
-    if temp_doc_id not in temp_documents:
-        return render_template('error.html', 
-                               error='Document not found or expired'), 404
-    
-    doc_info = temp_documents[temp_doc_id]
+    doc_info = temp_documents.get(temp_doc_id)
+    if doc_info is None:
+        return render_error('Document not found or expired', 404)
     
     # Check if document has expired
-    expires_at = datetime.fromisoformat(doc_info['expires_at'].rstrip('Z'))
-    if datetime.utcnow() > expires_at:
-        del temp_documents[temp_doc_id]
-        return render_template('error.html', 
-                               error='Document has expired'), 410
+    if time.time() > doc_info['expires_ts']:
+        temp_documents.pop(temp_doc_id, None)
+        return render_error('Document has expired', 410)
     
     # Check if user matches
     if doc_info['user'] != user['username']:
-        return render_template('error.html', 
-                               error='Unauthorized access'), 403
+        return render_error('Unauthorized access', 403)
     
     # Record document view
     record_document_view(user['username'], doc_info['document_id'])
@@ -178,15 +217,16 @@ def serve_pdf(temp_doc_id):
     - DAT (dat query parameter)
     - Auth token (token query parameter)
     """
-    jwt_handler = current_app.config['JWT_HANDLER']
-    plugin_manager = current_app.config['PLUGIN_MANAGER']
+    app_config = current_app.config
+    jwt_handler = app_config['JWT_HANDLER']
+    plugin_manager = app_config['PLUGIN_MANAGER']
     
     # Try DAT first
     dat = request.args.get('dat')
     username = None
     
     if dat:
-        dat_info = jwt_handler.validate_document_token(dat)
+        dat_info = validate_dat_cached(jwt_handler, dat)
         if dat_info and dat_info['temp_document_id'] == temp_doc_id:
             username = dat_info['username']
     
@@ -194,7 +234,7 @@ def serve_pdf(temp_doc_id):
     if not username:
         token = request.args.get('token')
         if token:
-            user = plugin_manager.auth_plugin.validate_token(token)
+            user = validate_token_cached(plugin_manager.auth_plugin, token)
             if user:
                 username = user['username']
     
@@ -202,30 +242,26 @@ def serve_pdf(temp_doc_id):
         abort(401)
     
     # Check if temp document exists
-    if temp_doc_id not in temp_documents:
+    doc_info = temp_documents.get(temp_doc_id)
+    if doc_info is None:
         abort(404)
     
-    doc_info = temp_documents[temp_doc_id]
-    
     # Check if user matches
     if doc_info['user'] != username:
         abort(403)
     
-    # Serve the cached PDF - use absolute path from app root
-    config = current_app.config['CONFIG']
-    cache_dir_config = config.cache.get('directory', './cache')
-    app_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    cache_dir = os.path.join(app_root, cache_dir_config.lstrip('./'))
-    cache_path = os.path.join(cache_dir, f"{temp_doc_id}.pdf")
+    # Serve the cached PDF from the cache directory resolved at startup
+    cache_path = os.path.join(app_config['CACHE_DIR'], doc_info.get('cache_file', f"{temp_doc_id}.pdf"))
     
-    if not os.path.exists(cache_path):
+    # send_file answers Range and conditional requests, so PDF.js can fetch
+    # only the byte ranges of the pages it renders. A missing file surfaces
+    # from its own stat, without a separate existence check.
+    try:
+        response = make_response(send_file(cache_path, mimetype='application/pdf', conditional=True))
+    except FileNotFoundError:
         abort(404)
     
-    response = make_response(send_file(cache_path, mimetype='application/pdf'))
-    
     # Add CORS headers for cross-domain PDF access
-    response.headers['Access-Control-Allow-Origin'] = '*'
-    response.headers['Access-Control-Allow-Methods'] = 'GET, OPTIONS'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+    response.headers.update(PDF_CORS_HEADERS)
     
     return response
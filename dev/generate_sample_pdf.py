@@ -1,5 +1,19 @@
 #!/usr/bin/env python3
-"""Generate a sample PDF for testing OpenMark."""
+"""Generate a sample PDF for testing OpenMark.
+
+sample.pdf is checked in, so the PDF is only rebuilt when it is missing
+or when --force is passed.
+"""
+
+import os
+import sys
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+output_path = os.path.join(script_dir, 'sample.pdf')
+
+if os.path.exists(output_path) and '--force' not in sys.argv[1:]:
+    print(f'PDF already exists: {output_path} (use --force to regenerate)')
+    sys.exit(0)
 
 from fpdf import FPDF
 
@@ -111,8 +125,5 @@ Each plugin type has a base class that defines the required interface.
 Create custom plugins by extending these base classes.''')
 
 # Save PDF
-import os
-script_dir = os.path.dirname(os.path.abspath(__file__))
-output_path = os.path.join(script_dir, 'sample.pdf')
 pdf.output(output_path)
 print(f'PDF created: {output_path}')
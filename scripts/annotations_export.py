@@ -26,12 +26,30 @@ import sys
 import json
 import argparse
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Nombre de lignes lues par aller-retour avec le curseur PostgreSQL
+EXPORT_FETCH_SIZE = 10000
 
 # Ajouter le répertoire parent au path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+def read_json_file(path: str) -> Any:
+    """Lit un fichier JSON, avec orjson (octets UTF-8 sans décodage texte) si disponible."""
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
 class AnnotationsManager:
     """Gestionnaire d'annotations utilisant la configuration de l'application."""
     
@@ -50,12 +68,12 @@ class AnnotationsManager:
         self.ann_config = self.config.get('plugins', {}).get('annotations', {}).get('config', {})
         
         self._plugin = self._init_plugin()
+        self._local_data = None
     
     def _load_config(self, config_path: str) -> dict:
         """Charge la configuration depuis le fichier JSON."""
         if os.path.exists(config_path):
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return read_json_file(config_path)
         raise FileNotFoundError(f"Fichier de configuration non trouvé: {config_path}")
     
     def _init_plugin(self):
@@ -76,45 +94,77 @@ class AnnotationsManager:
         """Récupère les annotations existantes."""
         return self._plugin.get_annotations(user_id, document_id)
     
-    def list_all_keys(self) -> List[tuple]:
-        """Liste toutes les clés user:document disponibles."""
-        if self.ann_type == 'local':
-            # Pour le backend local, lire directement le fichier
+    def _load_local_once(self) -> dict:
+        """Lit le fichier d'annotations local une seule fois et le garde en mémoire."""
+        if self._local_data is None:
             storage_path = self.ann_config.get('storage_path', './data/annotations.json')
             if not os.path.isabs(storage_path):
                 storage_path = os.path.join(self.project_root, storage_path)
             
-            if os.path.exists(storage_path):
-                with open(storage_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                return [tuple(key.split(':', 1)) for key in data.keys() if ':' in key]
-            return []
+            self._local_data = read_json_file(storage_path) if os.path.exists(storage_path) else {}
+        return self._local_data
+    
+    def list_all_keys(self) -> Iterator[tuple]:
+        """Parcourt toutes les clés user:document disponibles, sans les matérialiser."""
+        if self.ann_type == 'local':
+            # Pour le backend local, lire directement le fichier
+            for key in self._load_local_once():
+                if ':' in key:
+                    yield tuple(key.split(':', 1))
         
         elif self.ann_type == 'mongodb':
-            # Pour MongoDB, utiliser une requête distinct
-            if hasattr(self._plugin, '_collection') and self._plugin._collection:
+            # Pour MongoDB, le curseur récupère les documents par lots
+            if getattr(self._plugin, '_collection', None) is not None:
                 docs = self._plugin._collection.find({}, {'user_id': 1, 'document_id': 1})
-                return [(doc['user_id'], doc['document_id']) for doc in docs]
-            return []
+                for doc in docs:
+                    yield (doc['user_id'], doc['document_id'])
         
         elif self.ann_type == 'postgresql':
-            # Pour PostgreSQL, faire une requête
+            # Pour PostgreSQL, curseur nommé (côté serveur) lu par lots
+            # au lieu de charger toute la table avec fetchall()
             if hasattr(self._plugin, '_pool') and self._plugin._pool:
                 conn = self._plugin._get_connection()
                 try:
-                    with conn.cursor() as cur:
+                    with conn.cursor(name='annotations_export_keys') as cur:
+                        cur.itersize = EXPORT_FETCH_SIZE
+                        # Même référence de table que le plugin (accepte schema.table)
                         cur.execute(f"SELECT user_id, document_id FROM {self._plugin.table}")
-                        return [(row[0], row[1]) for row in cur.fetchall()]
+                        for row in cur:
+                            yield (row[0], row[1])
                 finally:
+                    # Clore la transaction ouverte par le curseur nommé
+                    conn.rollback()
                     self._plugin._put_connection(conn)
-            return []
-        
-        return []
     
     def list_user_documents(self, user_id: str) -> List[str]:
         """Liste tous les documents d'un utilisateur."""
-        all_keys = self.list_all_keys()
-        return [doc_id for uid, doc_id in all_keys if uid == user_id]
+        if self.ann_type == 'local':
+            # Filtrer directement sur le préfixe des clés, sans liste intermédiaire
+            prefix = f"{user_id}:"
+            return [key[len(prefix):] for key in self._load_local_once() if key.startswith(prefix)]
+        
+        elif self.ann_type == 'mongodb':
+            # Filtrer côté serveur : seuls les identifiants de documents transitent
+            if getattr(self._plugin, '_collection', None) is not None:
+                return self._plugin._collection.distinct('document_id', {'user_id': user_id})
+            return []
+        
+        elif self.ann_type == 'postgresql':
+            # Filtrer côté serveur (profite de l'index sur user_id)
+            if hasattr(self._plugin, '_pool') and self._plugin._pool:
+                conn = self._plugin._get_connection()
+                try:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            f"SELECT document_id FROM {self._plugin.table} WHERE user_id = %s",
+                            (user_id,)
+                        )
+                        return [row[0] for row in cur.fetchall()]
+                finally:
+                    self._plugin._put_connection(conn)
+            return []
+        
+        return [doc_id for uid, doc_id in self.list_all_keys() if uid == user_id]
     
     def get_backend_type(self) -> str:
         """Retourne le type de backend utilisé."""
@@ -246,15 +296,17 @@ Le fichier exporté est compatible avec annotations_import.py.
             verbose=args.verbose
         )
         
-        # Formater le JSON
-        if args.compact:
-            json_output = json.dumps(export_data, ensure_ascii=False)
+        # Formater le JSON directement en UTF-8
+        if ORJSON_AVAILABLE:
+            json_output = orjson.dumps(export_data, option=0 if args.compact else orjson.OPT_INDENT_2)
+        elif args.compact:
+            json_output = json.dumps(export_data, ensure_ascii=False).encode('utf-8')
         else:
-            json_output = json.dumps(export_data, indent=2, ensure_ascii=False)
+            json_output = json.dumps(export_data, indent=2, ensure_ascii=False).encode('utf-8')
         
         # Écrire la sortie
         if args.output:
-            with open(args.output, 'w', encoding='utf-8') as f:
+            with open(args.output, 'wb') as f:
                 f.write(json_output)
             
             total_notes = sum(len(d['annotations'].get('notes', [])) for d in export_data['data'])
@@ -266,7 +318,8 @@ Le fichier exporté est compatible avec annotations_import.py.
             print(f"   📄 Documents: {len(export_data['data'])}", file=sys.stderr)
         else:
             # Sortie stdout
-            print(json_output)
+            sys.stdout.buffer.write(json_output + b'\n')
+            sys.stdout.flush()
         
     except FileNotFoundError as e:
         print(f"❌ {e}", file=sys.stderr)
@@ -28,9 +28,21 @@ import os
 import sys
 import json
 import argparse
+import time
 from datetime import datetime
+from itertools import count
 from typing import List, Dict, Any, Optional, Tuple
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Compteur des IDs générés pour les annotations importées sans ID
+_id_counter = count(int(time.time() * 1000))
+
 # Ajouter le répertoire parent au path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -96,15 +108,23 @@ class AnnotationsManager:
         """Sauvegarde les annotations."""
         return self._plugin.save_annotations(user_id, document_id, annotations)
 
+    def save_annotations_bulk(self, items: List[Tuple[str, str, dict]]) -> bool:
+        """Sauvegarde les annotations de plusieurs documents en une seule fois."""
+        return self._plugin.save_annotations_bulk(items)
+
     def get_backend_type(self) -> str:
         """Retourne le type de backend utilisé."""
         return self.ann_type
 
 
 def generate_id(prefix: str) -> str:
-    """Génère un ID unique pour une annotation."""
-    timestamp = int(datetime.utcnow().timestamp() * 1000)
-    return f"{prefix}_{timestamp}"
+    """Génère un ID unique pour une annotation.
+
+    Le compteur part de l'horodatage (ms) au lancement du script : les IDs
+    gardent la même forme, sans lire l'horloge ni produire de doublons quand
+    plusieurs annotations sont générées dans la même milliseconde.
+    """
+    return f"{prefix}_{next(_id_counter)}"
 
 
 def validate_note(note: dict, index: int) -> Tuple[bool, List[str]]:
@@ -153,9 +173,9 @@ def validate_highlight(highlight: dict, index: int) -> Tuple[bool, List[str]]:
     return len(errors) == 0, errors
 
 
-def normalize_note(note: dict) -> dict:
+def normalize_note(note: dict, now: str = None) -> dict:
     """Normalise une note en ajoutant les champs manquants."""
-    now = datetime.utcnow().isoformat() + "Z"
+    now = now or datetime.utcnow().isoformat() + "Z"
 
     return {
         "id": note.get("id") or generate_id("note"),
@@ -171,9 +191,9 @@ def normalize_note(note: dict) -> dict:
     }
 
 
-def normalize_highlight(highlight: dict) -> dict:
+def normalize_highlight(highlight: dict, now: str = None) -> dict:
     """Normalise un surlignage en ajoutant les champs manquants."""
-    now = datetime.utcnow().isoformat() + "Z"
+    now = now or datetime.utcnow().isoformat() + "Z"
 
     return {
         "id": highlight.get("id") or generate_id("highlight"),
@@ -194,24 +214,26 @@ def normalize_highlight(highlight: dict) -> dict:
 
 def load_import_file(file_path: str) -> dict:
     """Charge et parse le fichier d'import JSON."""
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+    with open(file_path, "rb") as f:
+        content = f.read()
 
-        # Vérifier si le fichier est vide
-        if not content.strip():
-            raise ValueError("Le fichier est vide")
+    # Vérifier si le fichier est vide
+    if not content.strip():
+        raise ValueError("Le fichier est vide")
 
-        # Vérifier si le fichier utilise des guillemets simples (erreur Python courante)
-        if content.strip().startswith("{'") or "': '" in content:
+    try:
+        # orjson parse directement les octets UTF-8, sans décodage texte préalable
+        data = orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+    except json.JSONDecodeError as e:
+        # Vérifier si le fichier utilise des guillemets simples (erreur Python courante),
+        # uniquement quand le parsing a échoué
+        text = content.decode("utf-8", errors="replace")
+        if text.strip().startswith("{'") or "': '" in text:
             raise ValueError(
                 "Le fichier semble utiliser des guillemets simples (format Python dict). "
                 "JSON requiert des guillemets doubles. "
                 "Remplacez les ' par des \" dans le fichier."
             )
-
-        data = json.loads(content)
-    except json.JSONDecodeError as e:
         raise ValueError(
             f"Erreur de syntaxe JSON à la ligne {e.lineno}, colonne {e.colno}: {e.msg}"
         )
@@ -232,13 +254,52 @@ def load_import_file(file_path: str) -> dict:
         )
 
 
-def validate_import_data(import_data: dict) -> Tuple[bool, List[str]]:
-    """Valide les données d'import et retourne les erreurs."""
+def validate_and_normalize_annotations(
+    annotations: dict, now: str, errors: List[str], prefix: str = ""
+) -> Tuple[List[dict], List[dict]]:
+    """Valide et normalise les notes et surlignages d'une entrée en un seul passage.
+
+    Les erreurs sont ajoutées à `errors`. Dès qu'une erreur existe, l'import
+    sera refusé : la normalisation s'arrête et seule la validation continue.
+    """
+    notes = []
+    highlights = []
+
+    for j, note in enumerate(annotations.get("notes", [])):
+        valid, note_errors = validate_note(note, j)
+        if not valid:
+            errors.extend([f"{prefix}{e}" for e in note_errors])
+        elif not errors:
+            notes.append(normalize_note(note, now))
+
+    for j, hl in enumerate(annotations.get("highlights", [])):
+        valid, hl_errors = validate_highlight(hl, j)
+        if not valid:
+            errors.extend([f"{prefix}{e}" for e in hl_errors])
+        elif not errors:
+            highlights.append(normalize_highlight(hl, now))
+
+    return notes, highlights
+
+
+def prepare_import_data(
+    import_data: dict,
+) -> Tuple[List[Tuple[Optional[str], Optional[str], List[dict], List[dict]]], List[str]]:
+    """Valide et normalise les données d'import en un seul parcours.
+
+    Returns:
+        Tuple (entrées, erreurs). Chaque entrée est un tuple
+        (user_id, document_id, notes, highlights) ; user_id et document_id
+        valent None pour les formats simple et minimal. Les entrées ne sont
+        utilisables que si la liste d'erreurs est vide.
+    """
     errors = []
-    format_type = import_data["format"]
+    entries = []
     data = import_data["data"]
+    # Horodatage commun à toutes les annotations de cet import
+    now = datetime.utcnow().isoformat() + "Z"
 
-    if format_type == "multi":
+    if import_data["format"] == "multi":
         for i, entry in enumerate(data.get("data", [])):
             if "user_id" not in entry:
                 errors.append(f"Entrée #{i}: 'user_id' manquant")
@@ -247,28 +308,24 @@ def validate_import_data(import_data: dict) -> Tuple[bool, List[str]]:
             if "annotations" not in entry:
                 errors.append(f"Entrée #{i}: 'annotations' manquant")
             else:
-                ann = entry["annotations"]
-                for j, note in enumerate(ann.get("notes", [])):
-                    valid, note_errors = validate_note(note, j)
-                    errors.extend([f"Entrée #{i}, {e}" for e in note_errors])
-                for j, hl in enumerate(ann.get("highlights", [])):
-                    valid, hl_errors = validate_highlight(hl, j)
-                    errors.extend([f"Entrée #{i}, {e}" for e in hl_errors])
+                notes, highlights = validate_and_normalize_annotations(
+                    entry["annotations"], now, errors, prefix=f"Entrée #{i}, "
+                )
+                entries.append(
+                    (entry.get("user_id"), entry.get("document_id"), notes, highlights)
+                )
     else:
-        ann = data.get("annotations", {})
-        for j, note in enumerate(ann.get("notes", [])):
-            valid, note_errors = validate_note(note, j)
-            errors.extend(note_errors)
-        for j, hl in enumerate(ann.get("highlights", [])):
-            valid, hl_errors = validate_highlight(hl, j)
-            errors.extend(hl_errors)
+        notes, highlights = validate_and_normalize_annotations(
+            data.get("annotations", {}), now, errors
+        )
+        entries.append((None, None, notes, highlights))
 
-    return len(errors) == 0, errors
+    return entries, errors
 
 
 def import_annotations(
     manager: AnnotationsManager,
-    import_data: dict,
+    entries: List[Tuple[Optional[str], Optional[str], List[dict], List[dict]]],
     target_user: str = None,
     target_document: str = None,
     mode: str = "merge",
@@ -280,7 +337,7 @@ def import_annotations(
 
     Args:
         manager: Gestionnaire d'annotations
-        import_data: Données d'import parsées
+        entries: Entrées validées et normalisées (voir prepare_import_data)
         target_user: Utilisateur cible (override)
         target_document: Document cible (override)
         mode: 'merge' ou 'replace'
@@ -290,9 +347,6 @@ def import_annotations(
     Returns:
         Résultat de l'import avec statistiques
     """
-    format_type = import_data["format"]
-    data = import_data["data"]
-
     results = {
         "success": True,
         "imports": [],
@@ -301,30 +355,25 @@ def import_annotations(
         "errors": [],
     }
 
-    # Préparer les entrées à importer
-    entries = []
+    # Les formats simple et minimal n'indiquent ni utilisateur ni document
+    if any(
+        not (target_user or user_id) or not (target_document or document_id)
+        for user_id, document_id, _, _ in entries
+    ):
+        results["success"] = False
+        results["errors"].append(
+            "Format simple: --user et --document sont obligatoires"
+        )
+        return results
 
-    if format_type == "multi":
-        for entry in data.get("data", []):
-            user_id = target_user or entry["user_id"]
-            document_id = target_document or entry["document_id"]
-            annotations = entry["annotations"]
-            entries.append((user_id, document_id, annotations))
-    else:
-        if not target_user or not target_document:
-            results["success"] = False
-            results["errors"].append(
-                "Format simple: --user et --document sont obligatoires"
-            )
-            return results
-        entries.append((target_user, target_document, data.get("annotations", {})))
+    # Annotations finales par (user_id, document_id), sauvegardées en une fois
+    # à la fin : une entrée répétée part de l'état laissé par la précédente
+    pending = {}
 
     # Traiter chaque entrée
-    for user_id, document_id, annotations in entries:
-        notes_to_import = [normalize_note(n) for n in annotations.get("notes", [])]
-        highlights_to_import = [
-            normalize_highlight(h) for h in annotations.get("highlights", [])
-        ]
+    for user_id, document_id, notes_to_import, highlights_to_import in entries:
+        user_id = target_user or user_id
+        document_id = target_document or document_id
 
         if verbose:
             print(f"  📄 {user_id}:{document_id}")
@@ -332,9 +381,11 @@ def import_annotations(
                 f"     Notes: {len(notes_to_import)}, Highlights: {len(highlights_to_import)}"
             )
 
+        key = (user_id, document_id)
+
         if mode == "merge":
             # Récupérer les annotations existantes
-            existing = manager.get_annotations(user_id, document_id)
+            existing = pending.get(key) or manager.get_annotations(user_id, document_id)
             existing_notes = existing.get("notes", [])
             existing_highlights = existing.get("highlights", [])
 
@@ -346,15 +397,7 @@ def import_annotations(
             final_notes = notes_to_import
             final_highlights = highlights_to_import
 
-        final_annotations = {"notes": final_notes, "highlights": final_highlights}
-
-        if not dry_run:
-            success = manager.save_annotations(user_id, document_id, final_annotations)
-            if not success:
-                results["errors"].append(f"Échec sauvegarde {user_id}:{document_id}")
-                results["success"] = False
-        else:
-            success = True
+        pending[key] = {"notes": final_notes, "highlights": final_highlights}
 
         results["imports"].append(
             {
@@ -364,13 +407,26 @@ def import_annotations(
                 "highlights_imported": len(highlights_to_import),
                 "total_notes": len(final_notes),
                 "total_highlights": len(final_highlights),
-                "success": success,
+                "success": True,
             }
         )
 
         results["total_notes"] += len(notes_to_import)
         results["total_highlights"] += len(highlights_to_import)
 
+    if not dry_run and pending:
+        items = [
+            (user_id, document_id, annotations)
+            for (user_id, document_id), annotations in pending.items()
+        ]
+        if not manager.save_annotations_bulk(items):
+            results["errors"].append(
+                f"Échec sauvegarde de {len(items)} document(s)"
+            )
+            results["success"] = False
+            for imp in results["imports"]:
+                imp["success"] = False
+
     return results
 
 
@@ -449,11 +505,11 @@ Formats de fichier supportés:
         import_data = load_import_file(args.file)
         print(f"   Format détecté: {import_data['format']}")
 
-        # Valider les données
+        # Valider et normaliser les données
         print("🔍 Validation des données...")
-        valid, errors = validate_import_data(import_data)
+        entries, errors = prepare_import_data(import_data)
 
-        if not valid:
+        if errors:
             print("❌ Erreurs de validation:")
             for error in errors[:10]:  # Limiter l'affichage
                 print(f"   • {error}")
@@ -471,7 +527,7 @@ Formats de fichier supportés:
 
         results = import_annotations(
             manager=manager,
-            import_data=import_data,
+            entries=entries,
             target_user=args.user,
             target_document=args.document,
             mode=args.mode,
@@ -89,6 +89,30 @@ class TestAnnotationsAPI:
         response = client.get("/api/getAnnotations?documentId=sample")
         assert response.status_code == 401
 
+    @pytest.mark.integration
+    def test_get_annotations_not_modified(self, client, auth_headers, sample_annotations):
+        """Test revalidating unchanged annotations with their ETag."""
+        url = "/api/getAnnotations?documentId=etagdoc"
+        client.post(
+            "/api/saveAnnotations",
+            json={"documentId": "etagdoc", "annotations": {"notes": [], "highlights": []}},
+            headers=auth_headers,
+        )
+        response = client.get(url, headers=auth_headers)
+        etag = response.headers["ETag"]
+
+        response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+        client.post(
+            "/api/saveAnnotations",
+            json={"documentId": "etagdoc", "annotations": sample_annotations},
+            headers=auth_headers,
+        )
+        response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
     @pytest.mark.integration
     def test_get_annotations_missing_document_id(self, client, auth_headers):
         """Test retrieving annotations without document ID."""
@@ -93,6 +93,17 @@ class TestAuthenticationAPI:
         response = client.get("/api/statistics", headers=headers)
         assert response.status_code == 401
 
+    @pytest.mark.integration
+    def test_cached_token_rejected_after_logout(self, client, auth_headers):
+        """Test that logout revokes a token whose validation is cached."""
+        # Warm the token validation cache
+        assert client.get("/api/statistics", headers=auth_headers).status_code == 200
+
+        client.post("/api/logout", headers=auth_headers)
+
+        response = client.get("/api/statistics", headers=auth_headers)
+        assert response.status_code == 401
+
     @pytest.mark.integration
     @pytest.mark.parametrize(
         "username,password,expected_status",
@@ -1,7 +1,13 @@
 """Integration tests for document API."""
 
+import os
+import time
+from unittest.mock import patch
+
 import pytest
 
+from app.routes.api import get_cache_filename
+
 
 class TestDocumentAPI:
     """Tests for document-related API endpoints."""
@@ -145,6 +151,33 @@ class TestDocumentAPI:
 
         assert response.status_code == 404
 
+    @pytest.mark.integration
+    def test_serve_pdf_missing_cache_file(self, client, auth_headers):
+        """Test serving a temp document whose cache file is gone."""
+        from app.routes.api import register_temp_document
+
+        register_temp_document("temp_missingfile", {
+            "document_id": "missing",
+            "user": "testuser",
+            "cache_file": "doc_missing.pdf",
+            "expires_ts": time.time() + 60,
+        })
+        token = auth_headers["Authorization"].split(" ")[1]
+        response = client.get(f"/pdf/temp_missingfile?token={token}")
+
+        assert response.status_code == 404
+
+    @pytest.mark.integration
+    def test_view_document_error_page_reused(self, client, auth_headers):
+        """Test that a repeated error renders the same page."""
+        token = auth_headers["Authorization"].split(" ")[1]
+        first = client.get(f"/api/viewDocument?tempDocumentId=invalid&token={token}")
+        second = client.get(f"/api/viewDocument?tempDocumentId=invalid&token={token}")
+
+        assert second.status_code == 404
+        assert b"Document not found or expired" in second.data
+        assert second.data == first.data
+
     @pytest.mark.integration
     def test_download_status_pending(self, client, auth_headers):
         """Test download status for pending document."""
@@ -162,3 +195,43 @@ class TestDocumentAPI:
         assert response.status_code == 200
         data = response.get_json()
         assert "status" in data
+
+    @pytest.mark.integration
+    def test_request_document_fresh_cache_skips_exists_check(
+        self, app, client, auth_headers
+    ):
+        """Test that a fresh cached copy answers the existence check."""
+        cache_path = os.path.join(app.config["CACHE_DIR"], get_cache_filename("cached"))
+        with open(cache_path, "wb") as f:
+            f.write(b"%PDF-1.4 cached")
+
+        pdf_plugin = app.config["PLUGIN_MANAGER"].pdf_plugin
+        with patch.object(pdf_plugin, "document_exists", return_value=False) as exists:
+            response = client.post(
+                "/api/requestDocument", json={"documentId": "cached"}, headers=auth_headers
+            )
+
+        assert response.status_code == 200
+        exists.assert_not_called()
+
+    @pytest.mark.integration
+    def test_viewer_rejects_token_after_logout(self, client, auth_headers):
+        """Test that the viewer routes stop accepting a token once logged out."""
+        from app.routes.api import register_temp_document
+
+        register_temp_document("temp_logoutview", {
+            "document_id": "sample",
+            "user": "testuser",
+            "cache_file": "doc_logoutview.pdf",
+            "expires_ts": time.time() + 60,
+        })
+        token = auth_headers["Authorization"].split(" ")[1]
+        view_url = f"/api/viewDocument?tempDocumentId=temp_logoutview&token={token}"
+
+        # Warm the token validation cache through the viewer
+        assert client.get(view_url).status_code == 200
+
+        client.post("/api/logout", headers=auth_headers)
+
+        assert client.get(view_url).status_code == 401
+        assert client.get(f"/pdf/temp_logoutview?token={token}").status_code == 401
@@ -0,0 +1,113 @@
+"""Integration tests for the shared document cache."""
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+from unittest.mock import patch
+
+import pytest
+
+from app.cache_cleaner import CacheCleaner
+from app.routes import api
+from app.routes.api import get_cache_filename
+
+PDF_CONTENT = b"%PDF-1.4 shared"
+
+
+def new_temp_ids(before):
+    """Temporary document IDs registered since the given snapshot."""
+    return [temp_id for temp_id in list(api.temp_documents) if temp_id not in before]
+
+
+def wait_for(predicate, timeout=5):
+    """Poll until predicate() is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestDocumentCache:
+    """Tests for downloads into the shared cache file and its cleanup."""
+
+    @pytest.mark.integration
+    def test_absolute_cache_dir_is_kept(self, app, temp_dir):
+        """Test that an absolute cache directory is used as configured."""
+        assert app.config["CACHE_DIR"] == str(temp_dir / "cache")
+
+    @pytest.mark.integration
+    def test_concurrent_requests_download_once(self, app, client, auth_headers):
+        """Test that two concurrent requests for a document share one download."""
+        calls = []
+        release = threading.Event()
+        joined = threading.Event()
+
+        def slow_download(document_id, fileobj):
+            calls.append(document_id)
+            release.wait(5)
+            fileobj.write(PDF_CONTENT)
+            return True
+
+        class TrackedFuture(Future):
+            """Future signalling when a second request starts waiting on it."""
+
+            def result(self, timeout=None):
+                joined.set()
+                return super().result(timeout)
+
+        pdf_plugin = app.config["PLUGIN_MANAGER"].pdf_plugin
+        before = set(api.temp_documents)
+        with patch.object(pdf_plugin, "download_document", side_effect=slow_download), \
+                patch("app.routes.api.Future", TrackedFuture):
+            for _ in range(2):
+                response = client.post(
+                    "/api/requestDocument", json={"documentId": "sample"}, headers=auth_headers
+                )
+                assert response.status_code == 200
+
+            # The second download joins the first, which is still blocked
+            assert joined.wait(5)
+            release.set()
+
+            temp_ids = new_temp_ids(before)
+            assert len(temp_ids) == 2
+            assert wait_for(lambda: all(api.download_status.get(t) == "ready" for t in temp_ids))
+
+        assert calls == ["sample"]
+        cache_path = os.path.join(app.config["CACHE_DIR"], get_cache_filename("sample"))
+        with open(cache_path, "rb") as f:
+            assert f.read() == PDF_CONTENT
+
+    @pytest.mark.integration
+    def test_cleaner_keeps_referenced_file(self, app, client, auth_headers, monkeypatch):
+        """Test that a shared file is kept while a live entry references it."""
+        before = set(api.temp_documents)
+        response = client.post(
+            "/api/requestDocument", json={"documentId": "sample"}, headers=auth_headers
+        )
+        assert response.status_code == 200
+        temp_id = new_temp_ids(before)[0]
+        assert wait_for(lambda: api.download_status.get(temp_id) == "ready")
+
+        cache_dir = app.config["CACHE_DIR"]
+        cache_path = os.path.join(cache_dir, get_cache_filename("sample"))
+        # Older than the cache duration: only the live reference keeps it
+        old = time.time() - 7200
+        os.utime(cache_path, (old, old))
+
+        # A fresh cleaner over this request's entry only, since other tests
+        # leave entries for the same document in the module-level dict
+        monkeypatch.setattr(CacheCleaner, "_instance", None)
+        temp_documents = {temp_id: dict(api.temp_documents[temp_id])}
+        cleaner = CacheCleaner(cache_dir, 3600, temp_documents)
+
+        cleaner._perform_cleanup()
+        assert os.path.exists(cache_path)
+
+        temp_documents[temp_id]["expires_ts"] = time.time() - 1
+        cleaner._perform_cleanup()
+        assert temp_id not in temp_documents
+        assert not os.path.exists(cache_path)
@@ -238,6 +238,66 @@ class TestAnnotationsScripts:
 
         assert result.returncode != 0
 
+    @pytest.mark.unit
+    def test_annotations_import_quotes_in_content(
+        self, test_config_file, temp_dir, project_root
+    ):
+        """Test that quoted text inside a valid JSON note is accepted."""
+        config_file, _ = test_config_file
+        import_file = temp_dir / "quotes.json"
+        import_file.write_text(
+            json.dumps(
+                {"notes": [{"page": 1, "x": 1, "y": 2, "content": "voir 'a': 'b'"}]}
+            )
+        )
+
+        result = subprocess.run(
+            [
+                sys.executable,
+                str(project_root / "scripts" / "annotations_import.py"),
+                "-c",
+                config_file,
+                "-f",
+                str(import_file),
+                "-u",
+                "admin",
+                "-d",
+                "sample",
+                "--dry-run",
+            ],
+            capture_output=True,
+            text=True,
+            cwd=str(project_root),
+        )
+
+        assert result.returncode == 0
+
+    @pytest.mark.unit
+    def test_annotations_import_python_dict_file(
+        self, test_config_file, temp_dir, project_root
+    ):
+        """Test that a Python dict literal is reported as such."""
+        config_file, _ = test_config_file
+        import_file = temp_dir / "python_dict.json"
+        import_file.write_text("{'notes': []}")
+
+        result = subprocess.run(
+            [
+                sys.executable,
+                str(project_root / "scripts" / "annotations_import.py"),
+                "-c",
+                config_file,
+                "-f",
+                str(import_file),
+            ],
+            capture_output=True,
+            text=True,
+            cwd=str(project_root),
+        )
+
+        assert result.returncode != 0
+        assert "guillemets simples" in result.stdout
+
     @pytest.mark.unit
     def test_annotations_import_nonexistent_file(self, test_config_file, project_root):
         """Test import with non-existent file."""
@@ -0,0 +1,148 @@
+"""Unit tests for HTTP PDF source plugin."""
+
+import os
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+
+from app.plugins.pdf_source.http_source import HTTPSourcePlugin
+
+PDF_CONTENT = b"%PDF-1.4 remote"
+
+
+def make_response(status_code, content=b"", headers=None):
+    """Build a fake requests.Response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = headers or {}
+    return response
+
+
+class TestHTTPSourcePlugin:
+    """Tests for HTTP PDF source plugin."""
+
+    @pytest.fixture
+    def cache_dir(self, temp_dir):
+        """Create the local cache directory."""
+        path = temp_dir / "pdfs"
+        path.mkdir()
+        return path
+
+    @pytest.fixture
+    def plugin(self, cache_dir):
+        """Create plugin instance."""
+        return HTTPSourcePlugin({
+            "base_url": "https://docs.example.com/",
+            "local_path": str(cache_dir),
+            "revalidate_seconds": 60,
+        })
+
+    @pytest.fixture
+    def mock_get(self):
+        """Patch requests.get in the plugin module."""
+        with patch("app.plugins.pdf_source.http_source.requests.get") as mock:
+            yield mock
+
+    def expire(self, cache_dir, name="doc.pdf"):
+        """Move a cached copy out of its revalidation window."""
+        old = time.time() - 3600
+        os.utime(cache_dir / f"{name}.etag", (old, old))
+
+    @pytest.mark.unit
+    def test_get_document_200_is_cached(self, plugin, cache_dir, mock_get):
+        """Test that a downloaded PDF is written to the local path."""
+        mock_get.return_value = make_response(200, PDF_CONTENT, {"ETag": '"v1"'})
+
+        assert plugin.get_document("doc") == PDF_CONTENT
+        assert (cache_dir / "doc.pdf").read_bytes() == PDF_CONTENT
+        assert (cache_dir / "doc.pdf.etag").read_text() == '"v1"'
+
+        # Fresh copy is served without contacting the server
+        assert plugin.get_document("doc") == PDF_CONTENT
+        assert mock_get.call_count == 1
+
+    @pytest.mark.unit
+    def test_get_document_non_pdf_not_cached(self, plugin, cache_dir, mock_get):
+        """Test that a 200 body failing the PDF check is not cached."""
+        mock_get.return_value = make_response(
+            200, b"<html>error</html>", {"Content-Type": "text/html"}
+        )
+
+        assert plugin.get_document("doc") == b"<html>error</html>"
+        assert not (cache_dir / "doc.pdf").exists()
+
+    @pytest.mark.unit
+    def test_get_document_304_serves_cached_copy(self, plugin, cache_dir, mock_get):
+        """Test that a stale copy is revalidated with its ETag and mtime."""
+        mock_get.return_value = make_response(200, PDF_CONTENT, {"ETag": '"v1"'})
+        plugin.get_document("doc")
+        self.expire(cache_dir)
+
+        mock_get.return_value = make_response(304)
+        assert plugin.get_document("doc") == PDF_CONTENT
+
+        headers = mock_get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"v1"'
+        assert "If-Modified-Since" in headers
+        # The revalidation window restarts
+        assert plugin._is_fresh(str(cache_dir / "doc.pdf"))
+
+    @pytest.mark.unit
+    def test_get_document_without_etag_is_revalidated(self, plugin, cache_dir, mock_get):
+        """Test that a copy without ETag is revalidated with If-Modified-Since."""
+        mock_get.return_value = make_response(200, PDF_CONTENT)
+        plugin.get_document("doc")
+        self.expire(cache_dir)
+
+        mock_get.return_value = make_response(200, b"%PDF-1.4 updated")
+        assert plugin.get_document("doc") == b"%PDF-1.4 updated"
+
+        headers = mock_get.call_args.kwargs["headers"]
+        assert "If-None-Match" not in headers
+        assert "If-Modified-Since" in headers
+        assert (cache_dir / "doc.pdf").read_bytes() == b"%PDF-1.4 updated"
+
+    @pytest.mark.unit
+    def test_get_document_304_unreadable_copy_refetches(self, plugin, cache_dir, mock_get):
+        """Test that a 304 for a copy that can't be read triggers a plain download."""
+        mock_get.return_value = make_response(200, PDF_CONTENT, {"ETag": '"v1"'})
+        plugin.get_document("doc")
+        self.expire(cache_dir)
+
+        original_open = open
+
+        def failing_open(path, *args, **kwargs):
+            if str(path) == str(cache_dir / "doc.pdf") and mock_get.call_count == 2:
+                raise OSError("unreadable")
+            return original_open(path, *args, **kwargs)
+
+        mock_get.side_effect = [make_response(304), make_response(200, PDF_CONTENT)]
+        with patch("builtins.open", side_effect=failing_open):
+            assert plugin.get_document("doc") == PDF_CONTENT
+
+        assert mock_get.call_count == 3
+        assert "If-None-Match" not in mock_get.call_args.kwargs["headers"]
+
+    @pytest.mark.unit
+    def test_get_document_path_traversal(self, plugin, temp_dir, mock_get):
+        """Test that an ID escaping local_path is rejected."""
+        mock_get.return_value = make_response(200, PDF_CONTENT)
+
+        assert plugin.get_document("../../x") is None
+        assert plugin.get_document("../outside") is None
+        assert not (temp_dir / "outside.pdf").exists()
+        mock_get.assert_not_called()
+
+    @pytest.mark.unit
+    def test_get_document_stale_part_file(self, plugin, cache_dir, mock_get):
+        """Test that a temporary file left by a crash doesn't block caching."""
+        (cache_dir / "doc.pdf.part").write_bytes(b"partial")
+        mock_get.return_value = make_response(200, PDF_CONTENT)
+
+        assert plugin.get_document("doc") == PDF_CONTENT
+        assert (cache_dir / "doc.pdf").read_bytes() == PDF_CONTENT
+        # No new temporary file is left behind
+        assert sorted(p.name for p in cache_dir.iterdir()) == [
+            "doc.pdf", "doc.pdf.etag", "doc.pdf.part"
+        ]
@@ -138,6 +138,20 @@ class TestLocalAnnotationsPlugin:
         assert len(result1["notes"]) == 1
         assert len(result2["notes"]) == 1
 
+    @pytest.mark.unit
+    def test_save_annotations_bulk(self, plugin, sample_notes, sample_highlights):
+        """Test saving several documents at once."""
+        result = plugin.save_annotations_bulk(
+            [
+                ("user1", "doc1", {"notes": sample_notes, "highlights": []}),
+                ("user2", "doc1", {"notes": [], "highlights": sample_highlights}),
+            ]
+        )
+        assert result is True
+
+        assert len(plugin.get_annotations("user1", "doc1")["notes"]) == 2
+        assert len(plugin.get_annotations("user2", "doc1")["highlights"]) == 1
+
     @pytest.mark.unit
     def test_save_empty_annotations(self, plugin):
         """Test saving empty annotations."""
@@ -1,5 +1,6 @@
 """Unit tests for local PDF source plugin."""
 
+import io
 import pytest
 from pathlib import Path
 
@@ -90,3 +91,44 @@ class TestLocalSourcePlugin:
         assert plugin.document_exists("test-doc_2026") is True
         data = plugin.get_document("test-doc_2026")
         assert data is not None
+
+    @pytest.mark.unit
+    def test_recursive_lookup_uses_index(self, pdfs_dir):
+        """Test recursive lookup finds nested documents, including new ones."""
+        plugin = LocalSourcePlugin({"base_path": pdfs_dir, "recursive": True})
+        nested = Path(pdfs_dir) / "2026" / "invoices"
+        nested.mkdir(parents=True)
+        (nested / "invoice_001.pdf").write_bytes(b"%PDF-1.4 invoice")
+
+        assert plugin.document_exists("invoice_001") is True
+        assert plugin.get_document("invoice_001") == b"%PDF-1.4 invoice"
+
+        # Files added to a subdirectory after the index was built are found
+        (nested / "invoice_002.pdf").write_bytes(b"%PDF-1.4 invoice 2")
+        assert plugin.document_exists("invoice_002") is True
+        assert plugin.document_exists("invoice_003") is False
+
+    @pytest.mark.unit
+    def test_validate_pdf(self, plugin):
+        """Test PDF validation from the header only."""
+        pdfs_dir = Path(plugin.config["base_path"])
+        (pdfs_dir / "complete.pdf").write_bytes(b"%PDF-1.4\n" + b"0" * 4096 + b"\n%%EOF\n")
+        (pdfs_dir / "truncated.pdf").write_bytes(b"%PDF-1.4\n" + b"0" * 4096)
+        (pdfs_dir / "not_a_pdf.pdf").write_bytes(b"hello\n%%EOF\n")
+
+        assert plugin.validate_pdf("complete") is True
+        # Same rule as every source: the trailer is not checked
+        assert plugin.validate_pdf("truncated") is True
+        assert plugin.validate_pdf("not_a_pdf") is False
+        assert plugin.validate_pdf("nonexistent") is False
+        assert plugin.validate_pdf("../../../etc/passwd") is False
+
+    @pytest.mark.unit
+    def test_download_document(self, plugin):
+        """Test copying a document to a file object."""
+        buffer = io.BytesIO()
+        assert plugin.download_document("sample", buffer) is True
+        assert buffer.getvalue() == plugin.get_document("sample")
+
+        assert plugin.download_document("nonexistent", io.BytesIO()) is False
+        assert plugin.download_document("../../../etc/passwd", io.BytesIO()) is False
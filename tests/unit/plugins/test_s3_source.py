@@ -0,0 +1,102 @@
+"""Unit tests for S3 PDF source plugin."""
+
+import pytest
+from unittest.mock import MagicMock
+
+from app.plugins.pdf_source.s3_source import S3SourcePlugin
+
+
+def make_page(*keys):
+    """Build a list_objects_v2 page."""
+    return {"Contents": [{"Key": key} for key in keys]}
+
+
+class TestS3SourcePlugin:
+    """Tests for S3 PDF source plugin."""
+
+    @pytest.fixture
+    def client(self):
+        """Create a fake S3 client."""
+        return MagicMock()
+
+    @pytest.fixture
+    def plugin(self, client):
+        """Create plugin instance using the fake client."""
+        plugin = S3SourcePlugin({"bucket_name": "docs", "prefix": "pdfs/"})
+        plugin._s3_client = client
+        return plugin
+
+    def set_pages(self, client, pages):
+        """Make the paginator return the given pages, recording which were read."""
+        served = []
+
+        def paginate(**kwargs):
+            for page in pages:
+                served.append(page)
+                yield page
+
+        client.get_paginator.return_value.paginate.side_effect = paginate
+        return served
+
+    @pytest.mark.unit
+    def test_list_documents(self, plugin, client):
+        """Test that listed PDF keys are returned without prefix and extension."""
+        self.set_pages(client, [
+            make_page("pdfs/a.pdf", "pdfs/notes.txt", "pdfs/sub/b.PDF"),
+            make_page("pdfs/c.pdf"),
+        ])
+
+        assert plugin.list_documents() == ["a", "sub/b", "c"]
+
+        kwargs = client.get_paginator.return_value.paginate.call_args.kwargs
+        assert kwargs["Bucket"] == "docs"
+        assert kwargs["Prefix"] == "pdfs/"
+
+    @pytest.mark.unit
+    def test_list_documents_max_results_stops_paging(self, plugin, client):
+        """Test that listing stops requesting pages once max_results is reached."""
+        served = self.set_pages(client, [
+            make_page("pdfs/a.pdf", "pdfs/b.pdf"),
+            make_page("pdfs/c.pdf"),
+        ])
+
+        assert plugin.list_documents(max_results=2) == ["a", "b"]
+        assert len(served) == 1
+
+    @pytest.mark.unit
+    def test_iter_documents_prefix_suffix(self, plugin, client):
+        """Test that a sub-path is sent as the server-side prefix."""
+        self.set_pages(client, [make_page("pdfs/sub/b.pdf")])
+
+        assert list(plugin.iter_documents(prefix_suffix="sub/")) == ["sub/b"]
+
+        kwargs = client.get_paginator.return_value.paginate.call_args.kwargs
+        assert kwargs["Prefix"] == "pdfs/sub/"
+
+    @pytest.mark.unit
+    def test_get_document_ranged(self, plugin, client):
+        """Test that a large document is assembled from concurrent ranges."""
+        content = b"%PDF" + bytes(range(256)) * 4
+        plugin.range_chunk_size = 300
+
+        def get_object(Bucket, Key, Range, **kwargs):
+            start, end = (int(n) for n in Range[len("bytes="):].split("-"))
+            body = MagicMock()
+            part = content[start:end + 1]
+            body.read.side_effect = lambda n: part[:n]
+            body.iter_chunks.return_value = [part[4:]] if start == 0 else [part]
+            return {
+                "Body": body,
+                "ContentType": "application/pdf",
+                "ContentRange": f"bytes {start}-{end}/{len(content)}",
+                "ETag": '"v1"',
+            }
+
+        client.get_object.side_effect = get_object
+
+        document = plugin.get_document("doc")
+
+        assert document == content
+        assert isinstance(document, bytearray)
+        assert client.get_object.call_count == 4
+        assert client.get_object.call_args.kwargs["IfMatch"] == '"v1"'
@@ -0,0 +1,91 @@
+"""Unit tests for SFTP PDF source plugin."""
+
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+from app.plugins.pdf_source.sftp_source import SFTPSourcePlugin
+
+
+class TestSFTPSourcePlugin:
+    """Tests for the SFTP channel pool."""
+
+    @pytest.fixture
+    def plugin(self):
+        """Create plugin instance with a fake, connected SSH client."""
+        plugin = SFTPSourcePlugin({
+            "host": "sftp.example.com",
+            "username": "user",
+            "max_concurrency": 1,
+            "timeout": 5,
+        })
+        plugin._client = MagicMock()
+        plugin._client.get_transport.return_value.is_active.return_value = True
+        plugin._client.open_sftp.side_effect = lambda: MagicMock()
+        return plugin
+
+    def acquire_in_thread(self, plugin):
+        """Start a thread waiting for a channel; return (thread, result list)."""
+        result = []
+        thread = threading.Thread(target=lambda: result.append(plugin._acquire_channel()))
+        thread.start()
+        return thread, result
+
+    @pytest.mark.unit
+    def test_released_channel_is_reused(self, plugin):
+        """Test that a released channel wakes a waiter and is handed to it."""
+        generation, sftp = plugin._acquire_channel()
+        thread, result = self.acquire_in_thread(plugin)
+
+        plugin._release_channel(generation, sftp)
+        thread.join(timeout=2)
+
+        assert result == [(generation, sftp)]
+        assert plugin._client.open_sftp.call_count == 1
+
+    @pytest.mark.unit
+    def test_broken_channel_release_wakes_waiter(self, plugin):
+        """Test that discarding a broken channel lets a waiter open a new one."""
+        generation, sftp = plugin._acquire_channel()
+        thread, result = self.acquire_in_thread(plugin)
+
+        plugin._release_channel(generation, sftp, broken=True)
+        thread.join(timeout=2)
+
+        assert not thread.is_alive()
+        assert result[0][1] is not sftp
+        sftp.close.assert_called_once()
+        assert plugin._client.open_sftp.call_count == 2
+        assert plugin._open_channels == 1
+
+    @pytest.mark.unit
+    def test_acquire_times_out(self, plugin):
+        """Test that waiting for a busy pool gives up after the timeout."""
+        plugin.timeout = 0.05
+        plugin._acquire_channel()
+
+        with pytest.raises(TimeoutError):
+            plugin._acquire_channel()
+
+    @pytest.mark.unit
+    def test_fetch_error_discards_broken_channel(self, plugin):
+        """Test that a channel failing mid-transfer is not put back in the pool."""
+        sftp = MagicMock()
+        sftp.stat.side_effect = EOFError()
+        sftp.get_channel.return_value.closed = True
+        plugin._client.open_sftp.side_effect = [sftp]
+
+        assert plugin.get_document("doc") is None
+        sftp.close.assert_called_once()
+        assert plugin._idle_channels == []
+        assert plugin._open_channels == 0
+
+    @pytest.mark.unit
+    def test_missing_document_keeps_channel(self, plugin):
+        """Test that a missing file returns None and the channel is reused."""
+        sftp = MagicMock()
+        sftp.stat.side_effect = FileNotFoundError()
+        plugin._client.open_sftp.side_effect = [sftp]
+
+        assert plugin.get_document("doc") is None
+        assert plugin._idle_channels == [sftp]
@@ -0,0 +1,82 @@
+"""Unit tests for WebDAV PDF source plugin."""
+
+import pytest
+import requests
+from unittest.mock import MagicMock
+
+from app.plugins.pdf_source.webdav_source import WebDAVSourcePlugin
+
+
+def make_multistatus(*hrefs):
+    """Build a PROPFIND multi-status body listing the given hrefs."""
+    responses = "".join(
+        f"<D:response><D:href>{href}</D:href></D:response>" for href in hrefs
+    )
+    return f'<D:multistatus xmlns:D="DAV:">{responses}</D:multistatus>'.encode()
+
+
+class TestWebDAVSourcePlugin:
+    """Tests for WebDAV PDF source plugin."""
+
+    @pytest.fixture
+    def plugin(self):
+        """Create plugin instance with a fake session."""
+        plugin = WebDAVSourcePlugin({"base_url": "https://dav.example.com/"})
+        plugin._session = MagicMock()
+        return plugin
+
+    @pytest.mark.unit
+    def test_document_exists_found_is_cached(self, plugin):
+        """Test that a found document is remembered."""
+        plugin._session.head.return_value.status_code = 200
+
+        assert plugin.document_exists("doc") is True
+        assert plugin.document_exists("doc") is True
+        assert plugin._session.head.call_count == 1
+
+    @pytest.mark.unit
+    def test_document_exists_missing_not_cached(self, plugin):
+        """Test that a 404 is asked again, so new uploads show up at once."""
+        plugin._session.head.return_value.status_code = 404
+        assert plugin.document_exists("doc") is False
+
+        plugin._session.head.return_value.status_code = 200
+        assert plugin.document_exists("doc") is True
+        assert plugin._session.head.call_count == 2
+
+    @pytest.mark.unit
+    def test_get_document_metadata_missing_not_cached(self, plugin):
+        """Test that a metadata lookup for a missing document is not cached."""
+        plugin._session.request.return_value.status_code = 404
+
+        assert plugin.get_document_metadata("doc") is None
+        assert plugin.get_document_metadata("doc") is None
+        assert plugin._session.request.call_count == 2
+
+    @pytest.mark.unit
+    def test_list_documents_stops_at_max_results(self, plugin):
+        """Test that listing keeps PDFs only and stops at max_results."""
+        response = plugin._session.request.return_value.__enter__.return_value
+        response.status_code = 207
+        body = make_multistatus(
+            "https://dav.example.com/", "/a.pdf", "/notes.txt", "/b.PDF", "/c.pdf"
+        )
+        response.iter_content.side_effect = lambda size: iter([body[:40], b"", body[40:]])
+
+        assert plugin.list_documents(max_results=2) == ["a", "b"]
+        assert plugin.list_documents(max_results=0) == []
+
+    @pytest.mark.unit
+    def test_list_documents_body_error(self, plugin):
+        """Test that a transport error while reading the listing is handled."""
+        body = make_multistatus("/a.pdf", "/b.pdf")
+
+        def broken_body(size):
+            yield body[:body.index(b"</D:response>") + len(b"</D:response>")]
+            raise requests.exceptions.ChunkedEncodingError("connection reset")
+
+        response = plugin._session.request.return_value.__enter__.return_value
+        response.status_code = 207
+        response.iter_content.side_effect = broken_body
+
+        assert plugin.list_documents() == ["a"]